@@ -0,0 +1,7 @@
+"""Offline benchmarks of the WU weather integration.
+
+The fixtures/ are served by stub_server, so the update cycle can be
+measured and regression checked without the network. The checked in
+dashboard page and observations are synthetic, generated by synthesize;
+record saves live responses of a station to serve instead.
+"""
@@ -0,0 +1,225 @@
+"""Benchmark the table driven decoder against the inline chains it replaced.
+
+    python -m benchmarks.decode [--observations 1000] [--runs 20]
+
+Times ObservationDecoder.decode on one observation and decode_many on a
+batch, for the observations/current table in each unit system (m, e, h)
+and for the history summary table, which WU serves in imperial units.
+The "legacy" rows are the `if "x" in metric` chains of the former
+coordinator and sensor, filling a dict per observation. Reports the
+median time per observation in microseconds.
+"""
+from __future__ import annotations
+import argparse
+import copy
+import json
+import statistics
+import time
+
+from custom_components.WU_weather.decoder import UNIT_SECTIONS, get_decoder
+
+from .stub_server import OBSERVATIONS_FIXTURE
+
+METRIC = json.loads(OBSERVATIONS_FIXTURE.read_bytes())["observations"][0]
+
+
+def _c_to_f(celsius):
+    return celsius * 9.0/5.0 + 32
+
+
+def current_observation(units) -> dict:
+    """Return the fixture observation with its values in a unit system."""
+    observation = copy.deepcopy(METRIC)
+    metric = observation.pop("metric")
+    if units == "m":
+        section = metric
+    else:
+        section = {
+            "temp": metric["temp"],
+            "heatIndex": metric["heatIndex"],
+            "dewpt": metric["dewpt"],
+            "windChill": metric["windChill"],
+            "windSpeed": round(metric["windSpeed"] / 1.609344, 1),
+            "windGust": round(metric["windGust"] / 1.609344, 1),
+            "pressure": metric["pressure"],
+            "precipRate": metric["precipRate"],
+            "precipTotal": metric["precipTotal"],
+            "elev": metric["elev"],
+        }
+        if units == "e":
+            for key in ("temp", "heatIndex", "dewpt", "windChill"):
+                section[key] = round(_c_to_f(section[key]), 1)
+            section["pressure"] = round(metric["pressure"] / 33.86389, 2)
+            section["precipRate"] = round(metric["precipRate"] / 25.4, 2)
+            section["precipTotal"] = round(metric["precipTotal"] / 25.4, 2)
+    observation[UNIT_SECTIONS[units]] = section
+    return observation
+
+
+def summary_observation() -> dict:
+    """Return a history summary in imperial units, like observations/all."""
+    return {
+        "stationID": METRIC["stationID"],
+        "epoch": METRIC["epoch"],
+        "lat": METRIC["lat"],
+        "lon": METRIC["lon"],
+        "humidityAvg": METRIC["humidity"],
+        "winddirAvg": METRIC["winddir"],
+        "uvHigh": METRIC["uv"],
+        "imperial": {
+            "tempAvg": 61.5,
+            "dewptAvg": 52.0,
+            "windchillAvg": 61.5,
+            "windspeedAvg": 5.8,
+            "windgustAvg": 8.5,
+            "pressureMax": 30.01,
+            "precipRate": 0.0,
+            "precipTotal": 0.01,
+        },
+    }
+
+
+def legacy_current(observation, units) -> dict:
+    """Decode like the former coordinator, converting inline per unit system."""
+    data = {}
+    section_name = UNIT_SECTIONS[units]
+    if section_name in observation:
+        section = observation[section_name]
+        if "dewpt" in section:
+            data["dew_point"] = (
+                (section["dewpt"] - 32) * 5.0/9.0 if units == "e" else section["dewpt"]
+            )
+        if "windChill" in section:
+            data["apparent_temperature"] = (
+                (section["windChill"] - 32) * 5.0/9.0 if units == "e" else section["windChill"]
+            )
+        if "precipRate" in section:
+            data["precipitation"] = (
+                section["precipRate"] * 25.4 if units == "e" else section["precipRate"]
+            )
+            data["precipitation_unit"] = "mm"
+        if "precipTotal" in section:
+            data["precipitation_total"] = (
+                section["precipTotal"] * 25.4 if units == "e" else section["precipTotal"]
+            )
+        if "temp" in section:
+            data["temperature"] = (
+                (section["temp"] - 32) * 5.0/9.0 if units == "e" else section["temp"]
+            )
+            data["temperature_unit"] = "°C"
+        if "windSpeed" in section:
+            data["wind_speed"] = (
+                section["windSpeed"] * 1.609344 if units != "m" else section["windSpeed"]
+            )
+            data["wind_speed_unit"] = "km/h"
+        if "windGust" in section:
+            data["wind_gust_speed"] = (
+                section["windGust"] * 1.609344 if units != "m" else section["windGust"]
+            )
+        if "pressure" in section:
+            data["pressure"] = (
+                section["pressure"] * 33.86389 if units == "e" else section["pressure"]
+            )
+    if "humidity" in observation:
+        data["humidity"] = observation["humidity"]
+    if "winddir" in observation:
+        data["wind_bearing"] = observation["winddir"]
+    if "uv" in observation:
+        data["uv_index"] = observation["uv"]
+    if "epoch" in observation:
+        data["epoch"] = observation["epoch"]
+    if "lat" in observation:
+        data["latitude"] = observation["lat"]
+    if "lon" in observation:
+        data["longitude"] = observation["lon"]
+    return data
+
+
+def legacy_summary(summary, units="e") -> dict:
+    """Decode like the former sensor did the imperial page summaries."""
+    data = {}
+    if "imperial" in summary:
+        imperial = summary["imperial"]
+        if "dewptAvg" in imperial:
+            data["dew_point"] = (imperial["dewptAvg"] - 32) * 5/9
+        if "windchillAvg" in imperial:
+            data["apparent_temperature"] = (imperial["windchillAvg"] - 32) * 5/9
+        if "precipRate" in imperial:
+            data["precipitation"] = imperial["precipRate"] * 25.4
+            data["precipitation_unit"] = "mm"
+        if "precipTotal" in imperial:
+            data["precipitation_total"] = imperial["precipTotal"] * 25.4
+        if "tempAvg" in imperial:
+            data["temperature"] = (imperial["tempAvg"] - 32) * 5/9
+            data["temperature_unit"] = "°C"
+        if "windspeedAvg" in imperial:
+            data["wind_speed"] = imperial["windspeedAvg"] * 1.60934
+            data["wind_speed_unit"] = "km/h"
+        if "windgustAvg" in imperial:
+            data["wind_gust_speed"] = imperial["windgustAvg"] * 1.60934
+        if "pressureMax" in imperial:
+            data["pressure"] = imperial["pressureMax"] * 33.86389
+    if "humidityAvg" in summary:
+        data["humidity"] = summary["humidityAvg"]
+    if "winddirAvg" in summary:
+        data["wind_bearing"] = summary["winddirAvg"]
+    if "uvHigh" in summary:
+        data["uv_index"] = summary["uvHigh"]
+    if "epoch" in summary:
+        data["epoch"] = summary["epoch"]
+    return data
+
+
+def microseconds(function, count, runs) -> float:
+    """Return the median time of a call per observation, in microseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) / count * 1e6
+
+
+def cases():
+    """Yield the name, units, sample observation, decoder and legacy chain of each table."""
+    for units in UNIT_SECTIONS:
+        yield "current", units, current_observation(units), get_decoder(units), legacy_current
+    yield "summary", "e", summary_observation(), get_decoder("e", summary=True), legacy_summary
+
+
+def run(count, runs):
+    """Print the time per observation of each table and method."""
+    print(f"{'table':<8} {'units':<5} {'method':<12} {'µs/observation':>14}")
+    for table, units, observation, decoder, legacy in cases():
+        batch = [copy.deepcopy(observation) for _ in range(count)]
+        # The decoder must read the same values as the chain it replaced
+        expected = legacy(observation, units)
+        decoded = decoder.decode(observation)
+        for key, value in expected.items():
+            if not key.endswith("_unit"):
+                assert abs(getattr(decoded, key) - value) < 0.01, (table, units, key)
+
+        results = {
+            "legacy": microseconds(
+                lambda: [legacy(item, units) for item in batch], count, runs
+            ),
+            "decode": microseconds(
+                lambda: [decoder.decode(item) for item in batch], count, runs
+            ),
+            "decode_many": microseconds(lambda: decoder.decode_many(batch), count, runs),
+        }
+        for method, value in results.items():
+            print(f"{table:<8} {units:<5} {method:<12} {value:>14.2f}")
+
+
+def main(argv=None):
+    """Parse the command line and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--observations", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+    run(args.observations, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Measure the latency of a poll before and after the port to aiohttp.
+
+    python -m benchmarks.http_latency [--polls 200] [--latency 0.02]
+
+"before" fetches the observations like the integration used to: a
+requests.get in an executor thread, which opens a new TCP and TLS
+connection every time. "after" is WUApiClient on one shared aiohttp
+session, which keeps the connection alive between polls. Both poll the
+stub server over TLS with a self-signed certificate, and `--latency`
+adds a server delay to every answer. The handshakes are local, so a real
+network round trip would add to the difference of every new connection.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import datetime
+import ssl
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+import requests
+import urllib3
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from custom_components.WU_weather.api import OBSERVATIONS_PATH, WUApiClient
+from custom_components.WU_weather.governor import RequestGovernor
+
+from .stub_server import StubServer
+from .update_cycle import UNLIMITED
+
+STATION_ID = "IAMSTE256"
+
+
+def self_signed_context(directory) -> ssl.SSLContext:
+    """Return a server SSL context with a new certificate for 127.0.0.1."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_file = Path(directory) / "cert.pem"
+    key_file = Path(directory) / "key.pem"
+    cert_file.write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+async def async_poll_before(stub, polls) -> list[float]:
+    """Return the latency of polls made with requests in executor threads."""
+    loop = asyncio.get_running_loop()
+    params = {
+        "stationId": STATION_ID,
+        "numericPrecision": "decimal",
+        "format": "json",
+        "units": "m",
+        "apiKey": stub.api_key,
+    }
+
+    def fetch():
+        response = requests.get(
+            stub.url + OBSERVATIONS_PATH, params=params, timeout=10, verify=False
+        )
+        response.raise_for_status()
+        return response.json()
+
+    latencies = []
+    for _ in range(polls):
+        start = time.perf_counter()
+        await loop.run_in_executor(None, fetch)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def async_poll_after(stub, polls) -> list[float]:
+    """Return the latency of polls made by WUApiClient on a shared session."""
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False)) as session:
+        client = WUApiClient(
+            session,
+            stub.page_url(STATION_ID),
+            governor=RequestGovernor(UNLIMITED, UNLIMITED),
+            api_base_url=stub.url,
+        )
+        await client.async_get_api_key()
+        latencies = []
+        for _ in range(polls):
+            start = time.perf_counter()
+            await client.async_get_observations(STATION_ID)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summary(latencies) -> str:
+    """Return the median and p95 of latencies, in milliseconds."""
+    ordered = sorted(latencies)
+    p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+    return f"median {statistics.median(ordered) * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms"
+
+
+async def async_run(polls, latency):
+    """Poll the stub server both ways and print the latencies."""
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    stub = StubServer(latency)
+    with tempfile.TemporaryDirectory() as directory:
+        await stub.async_start(ssl_context=self_signed_context(directory))
+    try:
+        before = await async_poll_before(stub, polls)
+        after = await async_poll_after(stub, polls)
+    finally:
+        await stub.async_stop()
+    print(f"{polls} polls over TLS, {latency * 1000:.0f} ms server delay")
+    print(f"before (requests, executor, new connection)  {summary(before)}")
+    print(f"after  (aiohttp, shared keep-alive session)  {summary(after)}")
+
+
+def main(argv=None):
+    """Parse the command line and run the measurement."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    asyncio.run(async_run(args.polls, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Compare the Observation record with the per-poll dicts it replaced.
+
+    python -m benchmarks.observation_record [--stations 1 50 500] [--runs 20]
+
+For N stations, reports the memory each station's latest observation
+retains, and the time to serialize the state of all weather entities the
+way Home Assistant writes it: every property read through
+WeatherEntity.state_attributes, then the state and attributes encoded by
+json_bytes. "weather" covers the weather attributes both designs have,
+"full" adds the extra state attributes of WUWeather (aggregates, age). "dict" is the former design, one freshly built dict per poll
+read through `coordinator.data.get(...)`. "record" is WUWeather reading
+the slotted Observation.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from homeassistant.components.weather import WeatherEntity
+from homeassistant.const import (
+    UnitOfLength,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_bytes
+
+from custom_components.WU_weather.aggregates import StationAggregates
+from custom_components.WU_weather.decoder import get_decoder
+from custom_components.WU_weather.weather import WUWeather
+
+from .stub_server import OBSERVATIONS_FIXTURE
+
+RESPONSE = OBSERVATIONS_FIXTURE.read_bytes()
+
+
+def legacy_observation(response) -> dict:
+    """Build the dict the coordinator used to return for one poll."""
+    data = {}
+    summary = response["observations"][0]
+    metric = summary["metric"]
+    data["dew_point"] = metric["dewpt"]
+    data["apparent_temperature"] = metric["windChill"]
+    data["precipitation"] = metric["precipRate"]
+    data["precipitation_unit"] = "mm"
+    data["temperature"] = metric["temp"]
+    data["temperature_unit"] = "°C"
+    data["wind_speed"] = metric["windSpeed"]
+    data["wind_speed_unit"] = "km/h"
+    data["wind_gust_speed"] = metric["windGust"]
+    data["pressure"] = metric["pressure"]
+    data["humidity"] = summary["humidity"]
+    data["wind_bearing"] = summary["winddir"]
+    data["uv_index"] = summary["uv"]
+    data["latest_update"] = datetime.now().strftime("%m/%d/%Y, %H:%M:%S")
+    return data
+
+
+class LegacyWeather(WeatherEntity):
+    """The weather entity reading the former per-poll dict."""
+
+    def __init__(self, coordinator):
+        """Initialize."""
+        self.coordinator = coordinator
+
+    def _get(self, key):
+        if self.coordinator.data:
+            return self.coordinator.data.get(key)
+        return None
+
+    native_temperature = property(lambda self: self._get("temperature"))
+    native_apparent_temperature = property(lambda self: self._get("apparent_temperature"))
+    native_pressure = property(lambda self: self._get("pressure"))
+    humidity = property(lambda self: self._get("humidity"))
+    native_wind_speed = property(lambda self: self._get("wind_speed"))
+    wind_bearing = property(lambda self: self._get("wind_bearing"))
+    uv_index = property(lambda self: self._get("uv_index"))
+    native_wind_gust_speed = property(lambda self: self._get("wind_gust_speed"))
+    native_total_precipitation = property(lambda self: self._get("precipitation"))
+    native_temperature_unit = UnitOfTemperature.CELSIUS
+    native_pressure_unit = UnitOfPressure.HPA
+    native_wind_speed_unit = UnitOfSpeed.KILOMETERS_PER_HOUR
+    native_precipitation_unit = UnitOfLength.MILLIMETERS
+
+
+def memory_per_station(build, count) -> float:
+    """Return the bytes retained per station by the built observations."""
+    responses = [json.loads(RESPONSE) for _ in range(count)]
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        observations = [build(response) for response in responses]
+        del responses
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(observations) == count
+    return (after - before) / count
+
+
+def serialize(entities, extra):
+    """Encode the state of the entities like a state write does."""
+    for entity in entities:
+        attributes = entity.state_attributes
+        if extra:
+            attributes = {**attributes, **(entity.extra_state_attributes or {})}
+        json_bytes({"state": entity.state, "attributes": attributes})
+
+
+def serialize_time(entities, runs, extra=False) -> float:
+    """Return the median time to serialize all entities, in seconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        serialize(entities, extra)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def legacy_entities(hass, count):
+    """Return one former entity per station, each with its own coordinator."""
+    entities = []
+    for _ in range(count):
+        coordinator = SimpleNamespace(data=legacy_observation(json.loads(RESPONSE)))
+        entity = LegacyWeather(coordinator)
+        entity.hass = hass
+        entities.append(entity)
+    return entities
+
+
+def record_entities(hass, count):
+    """Return the WUWeather entities of one coordinator polling N stations."""
+    decoder = get_decoder("m")
+    stations = [f"IBENCH{index:04d}" for index in range(count)]
+    coordinator = SimpleNamespace(
+        data={station: decoder.decode_latest(json.loads(RESPONSE)) for station in stations},
+        aggregates={station: StationAggregates() for station in stations},
+        last_checked=datetime.now(),
+        stale_stations=set(),
+        substitutes={},
+        max_staleness=timedelta(hours=1),
+        last_update_success=True,
+    )
+    entities = []
+    for station in stations:
+        entity = WUWeather(coordinator, station, station)
+        entity.hass = hass
+        entities.append(entity)
+    return entities
+
+
+async def async_run(station_counts, runs):
+    """Measure both designs for each number of stations."""
+    decoder = get_decoder("m")
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            print(
+                f"{'stations':>8} {'design':<7} {'bytes/station':>13}"
+                f" {'weather ms':>10} {'µs/entity':>9} {'full ms':>8}"
+            )
+            for count in station_counts:
+                designs = {
+                    "dict": (legacy_observation, legacy_entities(hass, count)),
+                    "record": (decoder.decode_latest, record_entities(hass, count)),
+                }
+                for name, (build, entities) in designs.items():
+                    memory = memory_per_station(build, count)
+                    seconds = serialize_time(entities, runs)
+                    full = serialize_time(entities, runs, extra=True)
+                    print(
+                        f"{count:>8} {name:<7} {memory:>13.0f} {seconds * 1000:>10.2f}"
+                        f" {seconds / count * 1e6:>9.1f} {full * 1000:>8.2f}"
+                    )
+        finally:
+            await hass.async_stop(force=True)
+
+
+def main(argv=None):
+    """Parse the command line and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+    asyncio.run(async_run(args.stations, args.runs))
+
+
+if __name__ == "__main__":
+    main()
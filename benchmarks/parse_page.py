@@ -0,0 +1,95 @@
+"""Benchmark the apiKey extraction from the dashboard page.
+
+    python -m benchmarks.parse_page [--runs 20] [page.html ...]
+
+Compares ApiKeyExtractor, fed in the chunks the client downloads, with the
+BeautifulSoup path it replaced: a full html.parser DOM, json.loads of the
+whole app-root-state script and a walk over its entries. Reports the
+median parse time and the tracemalloc peak of each. The default page is
+the synthetic fixture, pass pages saved by benchmarks.record to measure
+real ones.
+"""
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from custom_components.WU_weather.api import CHUNK_SIZE
+from custom_components.WU_weather.parser import ApiKeyExtractor
+
+from .stub_server import PAGE_FIXTURE
+
+
+def extract_streaming(page: bytes) -> str | None:
+    """Extract the apiKey like the client does while downloading."""
+    extractor = ApiKeyExtractor()
+    for start in range(0, len(page), CHUNK_SIZE):
+        extractor.feed(page[start:start + CHUNK_SIZE])
+        if extractor.done:
+            break
+    return extractor.api_key
+
+
+def extract_beautifulsoup(page: bytes) -> str | None:
+    """Extract the apiKey like the integration did before the extractor."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page, "html.parser")
+    state = json.loads(soup.find("script", id="app-root-state").get_text())
+    for entry in state.values():
+        if "u" in entry:
+            return parse_qs(urlparse(entry["u"]).query).get("apiKey", [None])[0]
+    return None
+
+
+def measure(extract, page, runs) -> dict:
+    """Return the median time and the allocation peak of an extraction."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        api_key = extract(page)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        extract(page)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"api_key": api_key, "median_ms": statistics.median(times) * 1000, "peak_kib": peak / 1024}
+
+
+def main(argv=None):
+    """Parse the command line and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", type=Path, default=[PAGE_FIXTURE])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    methods = {"streaming": extract_streaming, "beautifulsoup": extract_beautifulsoup}
+    try:
+        import bs4  # noqa: F401
+    except ImportError:
+        print("beautifulsoup4 is not installed, only the extractor is measured")
+        del methods["beautifulsoup"]
+
+    print(f"{'page':<32} {'method':<14} {'KiB':>6} {'median ms':>10} {'peak KiB':>9}")
+    for path in args.pages:
+        page = path.read_bytes()
+        keys = set()
+        for name, extract in methods.items():
+            result = measure(extract, page, args.runs)
+            keys.add(result["api_key"])
+            print(
+                f"{path.name:<32} {name:<14} {len(page) / 1024:>6.0f}"
+                f" {result['median_ms']:>10.2f} {result['peak_kib']:>9.0f}"
+            )
+        if len(keys) != 1:
+            raise SystemExit(f"{path.name}: the methods found different keys {keys}")
+
+
+if __name__ == "__main__":
+    main()
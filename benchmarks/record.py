@@ -0,0 +1,67 @@
+"""Record the WU dashboard page and current observations of a station.
+
+    python -m benchmarks.record IAMSTE256
+
+Saves the live responses next to the synthetic fixtures, as
+fixtures/dashboard_<station>.html and observations_current_<station>.json.
+The apiKey is replaced by the placeholder of the synthetic page, so the
+recordings can be shared. Serve them with
+
+    python -m benchmarks.stub_server --page benchmarks/fixtures/dashboard_IAMSTE256.html \
+        --observations benchmarks/fixtures/observations_current_IAMSTE256.json
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import re
+from pathlib import Path
+
+import aiohttp
+
+from .stub_server import RECORDED_OBSERVATIONS, RECORDED_PAGE
+from .synthesize import SYNTHETIC_API_KEY
+
+DASHBOARD_URL = "https://www.wunderground.com/dashboard/pws/{station_id}"
+OBSERVATIONS_URL = "https://api.weather.com/v2/pws/observations/current"
+
+
+async def async_record(station_id):
+    """Download and save the page and observations of a station."""
+    async with aiohttp.ClientSession(
+        headers={"User-Agent": "Mozilla/5.0"}, raise_for_status=True
+    ) as session:
+        async with session.get(DASHBOARD_URL.format(station_id=station_id)) as response:
+            page = await response.read()
+        match = re.search(rb"apiKey=(\w+)", page)
+        if match is None:
+            raise SystemExit("No apiKey in the dashboard page")
+        api_key = match.group(1)
+        params = {
+            "stationId": station_id,
+            "numericPrecision": "decimal",
+            "format": "json",
+            "units": "m",
+            "apiKey": api_key.decode(),
+        }
+        async with session.get(OBSERVATIONS_URL, params=params) as response:
+            observations = await response.json()
+
+    page_path = Path(RECORDED_PAGE.format(station_id=station_id))
+    page_path.write_bytes(page.replace(api_key, SYNTHETIC_API_KEY.encode()))
+    Path(RECORDED_OBSERVATIONS.format(station_id=station_id)).write_text(
+        json.dumps(observations, separators=(",", ":")) + "\n"
+    )
+    print(f"Recorded {len(page)} bytes of page and the observations of {station_id}")
+
+
+def main(argv=None):
+    """Parse the command line and record the fixtures."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("station_id", nargs="?", default="IAMSTE256")
+    args = parser.parse_args(argv)
+    asyncio.run(async_record(args.station_id.upper()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Measure what the integration adds to Home Assistant's startup.
+
+    python -m benchmarks.startup [--runs 5] [--latency 0.2]
+
+Import: runs `python -X importtime` importing the weather and sensor
+platforms after the Home Assistant modules any installation has loaded
+already, and reports the time of everything imported on top, the
+heaviest modules and whether a module that must stay lazy (the recorder,
+SQLAlchemy, BeautifulSoup) was pulled in.
+
+Setup: times the YAML weather platform setup against the stub server
+until the weather entity has an observation, without stored data (the
+first refresh scrapes the page and polls the station) and with the data
+stored by a previous run (the observation is restored, the refresh runs
+in the background). `--latency` delays every stub answer.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.WU_weather import weather
+from custom_components.WU_weather.api import WUApiClient
+from custom_components.WU_weather.cache import async_get_shared_cache, normalize_url
+from custom_components.WU_weather.const import DOMAIN
+from custom_components.WU_weather.weather import PLATFORM_SCHEMA, yaml_storage_key
+
+from .stub_server import StubServer
+
+# Loaded by Home Assistant before any custom integration
+PRELOADED = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.components.http",
+    "homeassistant.components.sensor",
+    "homeassistant.components.weather",
+)
+
+PLATFORMS = ("custom_components.WU_weather.weather", "custom_components.WU_weather.sensor")
+
+# Modules only the backfill and the page scrape may import
+LAZY = ("homeassistant.components.recorder", "sqlalchemy", "bs4")
+
+MARKER = "-- integration --"
+
+STATION_ID = "IAMSTE256"
+
+
+def import_times() -> tuple[float, list[tuple[int, str]]]:
+    """Return the milliseconds imported on top of Home Assistant, and the modules."""
+    code = (
+        f"import sys\nimport {', '.join(PRELOADED)}\n"
+        f"sys.stderr.write({MARKER!r} + '\\n')\nsys.stderr.flush()\n"
+        f"import {', '.join(PLATFORMS)}\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stderr.splitlines()
+    modules = []
+    for line in lines[lines.index(MARKER) + 1:]:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules.append((int(self_us), name.strip()))
+    return sum(self_us for self_us, _ in modules) / 1000, modules
+
+
+async def async_setup_time(config_dir, stub) -> float:
+    """Return the seconds until the weather entity of a fresh instance has an observation."""
+    hass = HomeAssistant(config_dir)
+    try:
+        config = PLATFORM_SCHEMA({
+            "platform": DOMAIN,
+            "current_weather_url": stub.page_url(STATION_ID),
+        })
+        # The setup reuses the client shared for the page, make it poll the stub
+        async_get_shared_cache(hass).shared(
+            yaml_storage_key(config),
+            ("client", normalize_url(config["current_weather_url"]), config["compress"]),
+            lambda: WUApiClient(
+                async_get_clientsession(hass), config["current_weather_url"], api_base_url=stub.url
+            ),
+        )
+        entities = []
+        start = time.perf_counter()
+        await weather.async_setup_platform(hass, config, entities.extend)
+        coordinator = entities[0].coordinator
+        while not (coordinator.data and STATION_ID in coordinator.data):
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        await hass.async_block_till_done()
+        # Keep the observation and apiKey for the next, restoring, run
+        await coordinator._store.async_save(coordinator._data_to_store())
+        hass.data[DOMAIN]["coordinators"].pop(yaml_storage_key(config))
+        return elapsed
+    finally:
+        await hass.async_stop(force=True)
+
+
+async def async_setup_times(runs, latency) -> dict[str, float]:
+    """Return the median setup time without and with stored data, in milliseconds."""
+    async def async_load_platform(*args):
+        """Skip the sensor platform, which needs a set up integration."""
+
+    weather.async_load_platform = async_load_platform
+    stub = StubServer(latency)
+    await stub.async_start()
+    cold, restored = [], []
+    try:
+        for _ in range(runs):
+            with tempfile.TemporaryDirectory() as config_dir:
+                cold.append(await async_setup_time(config_dir, stub))
+                restored.append(await async_setup_time(config_dir, stub))
+    finally:
+        await stub.async_stop()
+    return {
+        "no stored data": statistics.median(cold) * 1000,
+        "restored": statistics.median(restored) * 1000,
+    }
+
+
+def main(argv=None):
+    """Parse the command line and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    totals = []
+    for _ in range(args.runs):
+        total, modules = import_times()
+        totals.append(total)
+    print(f"import on top of Home Assistant: {statistics.median(totals):.1f} ms median")
+    for self_us, name in sorted(modules, reverse=True)[:5]:
+        print(f"  {self_us / 1000:>7.1f} ms  {name}")
+    imported = {name for _, name in modules}
+    for name in LAZY:
+        print(f"  {name}: {'IMPORTED' if name in imported else 'not imported'}")
+
+    print(f"setup until the entity has an observation, stub latency {args.latency * 1000:.0f} ms:")
+    for case, milliseconds in asyncio.run(async_setup_times(args.runs, args.latency)).items():
+        print(f"  {case:<15} {milliseconds:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Local HTTP server serving a WU dashboard page and current observations.
+
+By default the synthetic fixtures written by benchmarks.synthesize are
+served, pages recorded with benchmarks.record can be served instead. Any
+station can be requested: the observation is served with the station ID
+and observation time rewritten, so 500 simulated stations need one
+fixture. Run standalone to serve the fixtures from another process:
+
+    python -m benchmarks.stub_server --port 8765 [--page recorded.html]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import copy
+import json
+import re
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aiohttp import web
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PAGE_FIXTURE = FIXTURES / "dashboard_synthetic.html"
+OBSERVATIONS_FIXTURE = FIXTURES / "observations_current_synthetic.json"
+
+PAGE_PATH = "/dashboard/pws/{station_id}"
+OBSERVATIONS_PATH = "/v2/pws/observations/current"
+NEARBY_PATH = "/v3/location/near"
+
+# Where benchmarks.record saves the responses of a station
+RECORDED_PAGE = str(FIXTURES / "dashboard_{station_id}.html")
+RECORDED_OBSERVATIONS = str(FIXTURES / "observations_current_{station_id}.json")
+
+# Age of the served observations, stations report every few minutes
+OBSERVATION_AGE = 30
+
+
+class StubServer:
+    """Serve the fixtures like www.wunderground.com and api.weather.com.
+
+    `latency` delays every answer, in seconds. Stations in `failing` are
+    answered with `failure_status`, and requests with another apiKey than
+    the one in the page with a 401. Stations in `locations` are served at
+    their location, and listed by the nearby stations lookup.
+    """
+
+    def __init__(self, latency=0.0, page=PAGE_FIXTURE, observations=OBSERVATIONS_FIXTURE):
+        """Initialize."""
+        self.page = Path(page).read_bytes()
+        self.observations = json.loads(Path(observations).read_bytes())
+        self.api_key = re.search(rb"apiKey=(\w+)", self.page).group(1).decode()
+        self.latency = latency
+        self.failing: set[str] = set()
+        self.failure_status = 502
+        self.failure_headers: dict[str, str] = {}
+        # Station ID -> (latitude, longitude)
+        self.locations: dict[str, tuple[float, float]] = {}
+        # Requests answered, per path kind
+        self.requests = Counter()
+        self.url = None
+        self._runner = None
+
+    def page_url(self, station_id="IAMSTE256"):
+        """Return the dashboard URL of a station."""
+        return self.url + PAGE_PATH.format(station_id=station_id)
+
+    def app(self) -> web.Application:
+        """Return the application serving the fixtures."""
+        app = web.Application()
+        app.router.add_get(PAGE_PATH, self._async_page)
+        app.router.add_get(OBSERVATIONS_PATH, self._async_observations)
+        app.router.add_get(NEARBY_PATH, self._async_nearby)
+        return app
+
+    async def async_start(self, host="127.0.0.1", port=0, ssl_context=None) -> str:
+        """Start listening, over TLS when an SSL context is given, return the base URL."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port, ssl_context=ssl_context).start()
+        scheme = "https" if ssl_context else "http"
+        self.url = f"{scheme}://{host}:{self._runner.addresses[0][1]}"
+        return self.url
+
+    async def async_stop(self):
+        """Stop listening."""
+        await self._runner.cleanup()
+
+    def observation(self, station_id, epoch=None) -> dict:
+        """Return the observations response of the fixture for a station."""
+        response = copy.deepcopy(self.observations)
+        observation = response["observations"][0]
+        epoch = int(time.time()) - OBSERVATION_AGE if epoch is None else epoch
+        observation["stationID"] = station_id
+        observation["epoch"] = epoch
+        observation["obsTimeUtc"] = datetime.fromtimestamp(epoch, timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+        if station_id in self.locations:
+            observation["lat"], observation["lon"] = self.locations[station_id]
+        return response
+
+    def nearby(self, latitude, longitude) -> dict:
+        """Return the location lookup listing the stations in `locations`, nearest first."""
+        stations = sorted(
+            self.locations.items(),
+            key=lambda item: (item[1][0] - latitude) ** 2 + (item[1][1] - longitude) ** 2,
+        )
+        return {
+            "location": {
+                "stationId": [station_id for station_id, _ in stations],
+                "latitude": [location[0] for _, location in stations],
+                "longitude": [location[1] for _, location in stations],
+            }
+        }
+
+    async def _async_delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _async_page(self, request: web.Request) -> web.Response:
+        self.requests["page"] += 1
+        await self._async_delay()
+        return web.Response(body=self.page, content_type="text/html")
+
+    async def _async_observations(self, request: web.Request) -> web.Response:
+        self.requests["observations"] += 1
+        await self._async_delay()
+        if request.query.get("apiKey") != self.api_key:
+            return web.Response(status=401)
+        station_id = request.query.get("stationId", "")
+        if station_id in self.failing:
+            return web.Response(status=self.failure_status, headers=self.failure_headers)
+        return web.json_response(self.observation(station_id))
+
+    async def _async_nearby(self, request: web.Request) -> web.Response:
+        self.requests["nearby"] += 1
+        await self._async_delay()
+        if request.query.get("apiKey") != self.api_key:
+            return web.Response(status=401)
+        latitude, longitude = (float(value) for value in request.query["geocode"].split(","))
+        return web.json_response(self.nearby(latitude, longitude))
+
+
+def main(argv=None):
+    """Serve the fixtures until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--page", type=Path, default=PAGE_FIXTURE)
+    parser.add_argument("--observations", type=Path, default=OBSERVATIONS_FIXTURE)
+    args = parser.parse_args(argv)
+    web.run_app(
+        StubServer(args.latency, args.page, args.observations).app(), host=args.host, port=args.port, access_log=None
+    )
+
+
+if __name__ == "__main__":
+    main()
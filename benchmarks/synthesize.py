@@ -0,0 +1,140 @@
+"""Generate the synthetic fixtures served by the stub server.
+
+    python -m benchmarks.synthesize
+
+The dashboard page is not a recording: it is generated to have the size
+(about 660 KiB) and the layout the extractor depends on, i.e. the
+app-root-state script after the rendered content, its entries holding
+nested number arrays and every third one a "u" URL carrying the apiKey.
+The key is the placeholder SYNTHETIC_API_KEY. The observations response
+is a hand written WU v2 metric observation. The output is deterministic,
+re-running the script reproduces the checked in files byte for byte.
+"""
+from __future__ import annotations
+import json
+import random
+
+from .stub_server import OBSERVATIONS_FIXTURE, PAGE_FIXTURE
+
+SYNTHETIC_API_KEY = "0123456789abcdef0123456789abcdef"
+
+OBSERVATIONS = {
+    "observations": [
+        {
+            "stationID": "IAMSTE256",
+            "obsTimeUtc": "2024-05-14T09:55:02Z",
+            "obsTimeLocal": "2024-05-14 11:55:02",
+            "neighborhood": "Amstelveen",
+            "softwareType": "EasyWeatherPro_V5.1.1",
+            "country": "NL",
+            "solarRadiation": 412.3,
+            "lon": 4.862,
+            "realtimeFrequency": None,
+            "epoch": 1715680502,
+            "lat": 52.301,
+            "uv": 3.0,
+            "winddir": 243,
+            "humidity": 71.0,
+            "qcStatus": 1,
+            "metric": {
+                "temp": 16.4,
+                "heatIndex": 16.4,
+                "dewpt": 11.1,
+                "windChill": 16.4,
+                "windSpeed": 9.4,
+                "windGust": 13.7,
+                "pressure": 1016.26,
+                "precipRate": 0.00,
+                "precipTotal": 0.30,
+                "elev": -2.1,
+            },
+        }
+    ]
+}
+
+
+def _noise(rng, depth=0):
+    """Return nested number arrays like the cached API responses of the page."""
+    if depth > 2:
+        return rng.uniform(-100, 100)
+    return {
+        f"k{index}": _noise(rng, depth + 1)
+        if rng.random() < 0.3
+        else [round(rng.uniform(0, 50), 2) for _ in range(12)]
+        for index in range(8)
+    }
+
+
+def synthetic_page(seed=256) -> str:
+    """Return the synthetic dashboard page."""
+    rng = random.Random(seed)
+    parts = [
+        '<!DOCTYPE html><html lang="en-US"><head><meta charset="utf-8"><title>'
+        "Amstelveen, Noord-Holland Weather Conditions | Weather Underground</title>"
+    ]
+    for _ in range(40):
+        parts.append(
+            f'<link rel="preload" href="/assets/chunk-{rng.getrandbits(48):012x}.js" as="script">'
+        )
+    for index in range(25):
+        parts.append(f'<meta name="wu-meta-{index}" content="{rng.getrandbits(64):016x}">')
+    css = "".join(
+        f".c{rng.getrandbits(32):08x}{{margin:{rng.randint(0, 20)}px;"
+        f"padding:{rng.randint(0, 20)}px;color:#{rng.getrandbits(24):06x};display:flex}}"
+        for _ in range(1400)
+    )
+    parts.append(
+        f'<style>{css}</style></head><body><app-root ng-version="12.2.16"><div class="wu-page">'
+    )
+    parts.append(
+        '<header class="wu-header"><nav>'
+        + "".join(
+            f'<a href="/weather/nl/city-{index}" class="nav-link">City {index}</a>'
+            for index in range(80)
+        )
+        + "</nav></header>"
+    )
+    parts.append('<lib-pws-dashboard><div class="dashboard"><table class="history-table"><tbody>')
+    for index in range(350):
+        cells = "".join(
+            f'<td class="cell"><span class="wu-value wu-value-to">{rng.uniform(-5, 30):.1f}'
+            '</span><span class="wu-label">°C</span></td>'
+            for _ in range(6)
+        )
+        parts.append(f'<tr class="row-{index % 2}">{cells}</tr>')
+    parts.append("</tbody></table></div></lib-pws-dashboard>")
+    for _ in range(6):
+        script = ";".join(
+            f"var v{rng.getrandbits(32):08x}=function(a,b){{return a+b*{rng.randint(1, 99)}}}"
+            for _ in range(300)
+        )
+        parts.append(f"<script>{script}</script>")
+    parts.append("</div></app-root>")
+
+    state = {}
+    for index in range(60):
+        entry = {"b": _noise(rng)}
+        if index % 3 == 0:
+            entry["u"] = (
+                f"https://api.weather.com/v3/wx/observations/current?apiKey={SYNTHETIC_API_KEY}"
+                f"&geocode=52.30,4.86&language=en-US&units=e&format=json&req={index}"
+            )
+        state[str(rng.getrandbits(31))] = entry
+    parts.append(
+        '<script id="app-root-state" type="application/json">'
+        + json.dumps(state, separators=(",", ":"))
+        + "</script>"
+    )
+    parts.append("</body></html>\n")
+    return "".join(parts)
+
+
+def main():
+    """Write the synthetic fixtures."""
+    PAGE_FIXTURE.write_text(synthetic_page(), encoding="utf-8")
+    OBSERVATIONS_FIXTURE.write_text(json.dumps(OBSERVATIONS, separators=(",", ":")) + "\n")
+    print(f"Wrote {PAGE_FIXTURE} and {OBSERVATIONS_FIXTURE}")
+
+
+if __name__ == "__main__":
+    main()
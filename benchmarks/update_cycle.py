@@ -0,0 +1,237 @@
+"""Benchmark the update cycle of WeatherUpdateCoordinator against the stub server.
+
+    python -m benchmarks.update_cycle --stations 1 50 500 --cycles 5
+
+The stub server runs in a child process, so the CPU time and memory are
+the integration's own. Every cycle polls all stations through
+_async_update_data, the first one also scrapes the dashboard page. Per
+cycle the wall and CPU time, the peak RSS of the process and how long the
+event loop was blocked are reported. The allocations are measured in one
+more cycle under tracemalloc, which slows everything down.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import resource
+import socket
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.WU_weather.api import WUApiClient
+from custom_components.WU_weather.coordinator import WeatherUpdateCoordinator
+from custom_components.WU_weather.governor import RequestGovernor
+from custom_components.WU_weather.worker import ParseWorker
+
+from .stub_server import StubServer
+
+# How often the event loop monitor wakes up, in seconds
+LOOP_PROBE_INTERVAL = 0.005
+
+# No budget, the benchmark measures the cycle and not the governor
+UNLIMITED = 10**9
+
+
+class LoopMonitor:
+    """Measure how late a periodic timer fires, i.e. how long the loop is blocked."""
+
+    def __init__(self, interval=LOOP_PROBE_INTERVAL):
+        """Initialize."""
+        self.interval = interval
+        self.longest = 0.0
+        self.total = 0.0
+        self._task = None
+
+    async def _async_run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            late = loop.time() - start - self.interval
+            if late > 0:
+                self.longest = max(self.longest, late)
+                self.total += late
+
+    def __enter__(self):
+        self._task = asyncio.ensure_future(self._async_run())
+        return self
+
+    def __exit__(self, *exc_info):
+        self._task.cancel()
+
+
+def peak_rss_mib() -> float:
+    """Return the peak resident set size of the process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def simulated_stations(count) -> list[str]:
+    """Return the IDs of the simulated stations."""
+    return [f"IBENCH{index:04d}" for index in range(count)]
+
+
+def make_coordinator(hass, stub_url, stations, parse_worker):
+    """Return a coordinator polling the stub server."""
+    client = WUApiClient(
+        async_get_clientsession(hass),
+        f"{stub_url}/dashboard/pws/{stations[0]}",
+        governor=RequestGovernor(UNLIMITED, UNLIMITED),
+        api_base_url=stub_url,
+        parse_worker=parse_worker,
+    )
+    return WeatherUpdateCoordinator(
+        hass, client, stations, f"wu_weather_bench.{len(stations)}"
+    )
+
+
+def make_due(coordinator):
+    """Make every station due and drop the responses cached by the last cycle."""
+    for schedule in coordinator._schedules.values():
+        schedule.due = 0.0
+    coordinator._cache._entries.clear()
+
+
+async def async_cycle(coordinator) -> dict:
+    """Run one update cycle and return its measurements."""
+    make_due(coordinator)
+    with LoopMonitor() as monitor:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        coordinator.data = await coordinator._async_update_data()
+        cpu = time.process_time() - cpu
+        wall = time.perf_counter() - wall
+    if len(coordinator.data) != len(coordinator.stations):
+        raise RuntimeError(f"{len(coordinator.data)} of {len(coordinator.stations)} stations updated")
+    return {
+        "wall_ms": wall * 1000,
+        "cpu_ms": cpu * 1000,
+        "loop_max_ms": monitor.longest * 1000,
+        "loop_total_ms": monitor.total * 1000,
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+async def async_allocations(coordinator) -> dict:
+    """Run one cycle under tracemalloc and return the memory it allocated."""
+    make_due(coordinator)
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        coordinator.data = await coordinator._async_update_data()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kib": (peak - before) / 1024,
+        "alloc_retained_kib": (after - before) / 1024,
+    }
+
+
+async def async_start_stub(in_process):
+    """Start the stub server, return its URL and how to stop it."""
+    if in_process:
+        stub = StubServer()
+        return await stub.async_start(), stub.async_stop
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.stub_server", "--port", str(port),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        break
+
+    async def async_stop():
+        process.terminate()
+        await process.wait()
+
+    return f"http://127.0.0.1:{port}", async_stop
+
+
+async def async_run(station_counts, cycles, in_process=False) -> list[dict]:
+    """Benchmark the update cycle for each number of stations."""
+    url, async_stop = await async_start_stub(in_process)
+    results = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        parse_worker = ParseWorker()
+        try:
+            for count in station_counts:
+                coordinator = make_coordinator(
+                    hass, url, simulated_stations(count), parse_worker
+                )
+                for cycle in range(cycles):
+                    results.append(
+                        {"stations": count, "cycle": cycle, **await async_cycle(coordinator)}
+                    )
+                results.append(
+                    {"stations": count, "cycle": "traced", **await async_allocations(coordinator)}
+                )
+        finally:
+            parse_worker.shutdown()
+            await async_stop()
+            await hass.async_stop(force=True)
+    return results
+
+
+def print_table(results):
+    """Print the measurements, one line per cycle."""
+    columns = (
+        ("stations", 0),
+        ("cycle", 0),
+        ("wall_ms", 1),
+        ("cpu_ms", 1),
+        ("loop_max_ms", 1),
+        ("loop_total_ms", 1),
+        ("peak_rss_mib", 1),
+        ("alloc_peak_kib", 0),
+        ("alloc_retained_kib", 0),
+    )
+    print("  ".join(name for name, _ in columns))
+    for result in results:
+        cells = []
+        for name, digits in columns:
+            value = result.get(name, "")
+            if isinstance(value, float):
+                value = f"{value:.{digits}f}"
+            cells.append(f"{value:>{len(name)}}")
+        print("  ".join(cells))
+
+
+def main(argv=None):
+    """Parse the command line and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument(
+        "--in-process", action="store_true", help="serve the fixtures from this process"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    args = parser.parse_args(argv)
+    results = asyncio.run(async_run(args.stations, args.cycles, args.in_process))
+    if args.json:
+        for result in results:
+            print(json.dumps(result))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
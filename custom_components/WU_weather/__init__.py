@@ -1,25 +1,62 @@
 """The Combined Weather integration."""
 from __future__ import annotations
+import time
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.const import Platform
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
+from .backfill import async_setup_services
 from .const import DOMAIN
+from .coordinator import async_create_coordinator
+
+# Configured through the UI or as a weather platform, never under WU_weather:
+CONFIG_SCHEMA = cv.platform_only_config_schema(DOMAIN)
 
 # List of platforms that this integration will create.
-#PLATFORMS: list[Platform] = [Platform.SENSOR]#, Platform.WEATHER]
-PLATFORMS: list[Platform] = [Platform.WEATHER]
+PLATFORMS: list[Platform] = [Platform.WEATHER, Platform.SENSOR]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the services shared by all configurations."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Combined Weather from a config entry."""
-    # Forward the setup to the sensor platform.
-    hass.config_entries.async_setup_platforms(entry, PLATFORMS)
+    start = time.perf_counter()
+    config = {"name": entry.title, **entry.data, **entry.options}
+
+    # The coordinator is shared by the weather and sensor platforms
+    coordinator = async_create_coordinator(hass, config, f"{DOMAIN}.{entry.entry_id}")
+    if coordinator is None:
+        return False
+
+    await coordinator.async_restore()
+    # The entities are available from the cached observations from here on
+    coordinator.metrics.record("setup", time.perf_counter() - start)
+    entry.async_on_unload(coordinator.async_release)
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh(), f"{DOMAIN} {entry.title} first refresh"
+    )
+
+    # Forward the setup to the weather and sensor platforms.
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Reload the entry when the options (URLs, stations) are changed.
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    # Unload the sensor platform when the integration is removed.
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
\ No newline at end of file
+    # Unload the platforms when the integration is removed, the coordinator
+    # releases its shared cache entries through async_on_unload.
+    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
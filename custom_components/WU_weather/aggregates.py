@@ -0,0 +1,211 @@
+"""Rolling aggregates of a station, updated incrementally per observation."""
+from __future__ import annotations
+from collections import deque
+import time
+
+# Windows of the aggregates, in seconds
+DAY = 24 * 3600
+PRESSURE_TENDENCY_WINDOW = 3 * 3600
+
+
+class WindowExtreme:
+    """Minimum or maximum of the values of a time window.
+
+    A monotonic deque keeps only the values that can still become the
+    extreme, so adding a value and reading the extreme are amortized O(1).
+    """
+
+    def __init__(self, window, maximum=False):
+        """Initialize."""
+        self.window = window
+        self.maximum = maximum
+        self._samples = deque()
+
+    def add(self, epoch, value):
+        """Add a value observed at an epoch."""
+        samples = self._samples
+        if self.maximum:
+            while samples and samples[-1][1] <= value:
+                samples.pop()
+        else:
+            while samples and samples[-1][1] >= value:
+                samples.pop()
+        samples.append((epoch, value))
+        self.expire(epoch)
+
+    def expire(self, now):
+        """Drop the values that left the window."""
+        samples = self._samples
+        while samples and samples[0][0] <= now - self.window:
+            samples.popleft()
+
+    @property
+    def value(self):
+        """Return the extreme, None when the window is empty."""
+        return self._samples[0][1] if self._samples else None
+
+    def to_list(self):
+        """Return the samples to persist."""
+        return list(self._samples)
+
+    def restore(self, samples):
+        """Restore persisted samples."""
+        self._samples = deque(tuple(sample) for sample in samples)
+
+
+class WindowSum:
+    """Sum of the values of a time window, kept in a ring buffer."""
+
+    def __init__(self, window):
+        """Initialize."""
+        self.window = window
+        self._samples = deque()
+        self.total = 0.0
+
+    def add(self, epoch, value):
+        """Add a value observed at an epoch."""
+        self._samples.append((epoch, value))
+        self.total += value
+        self.expire(epoch)
+
+    def expire(self, now):
+        """Drop the values that left the window."""
+        samples = self._samples
+        while samples and samples[0][0] <= now - self.window:
+            self.total -= samples.popleft()[1]
+        if not samples:
+            # Do not carry floating point residue into an empty window
+            self.total = 0.0
+
+    def to_list(self):
+        """Return the samples to persist."""
+        return list(self._samples)
+
+    def restore(self, samples):
+        """Restore persisted samples."""
+        self._samples = deque(tuple(sample) for sample in samples)
+        self.total = sum(value for _, value in self._samples)
+
+
+class WindowChange:
+    """Change of a value since the start of a time window.
+
+    The oldest kept sample is the last one at or before the window start,
+    so the change is measured over at least the whole window once enough
+    samples are known.
+    """
+
+    def __init__(self, window):
+        """Initialize."""
+        self.window = window
+        self._samples = deque()
+
+    def add(self, epoch, value):
+        """Add a value observed at an epoch."""
+        self._samples.append((epoch, value))
+        self.expire(epoch)
+
+    def expire(self, now):
+        """Drop the samples older than the one starting the window."""
+        samples = self._samples
+        while len(samples) > 1 and samples[1][0] <= now - self.window:
+            samples.popleft()
+
+    @property
+    def value(self):
+        """Return the change, None until the window is covered."""
+        samples = self._samples
+        if len(samples) < 2 or samples[-1][0] - samples[0][0] < self.window:
+            return None
+        return samples[-1][1] - samples[0][1]
+
+    def to_list(self):
+        """Return the samples to persist."""
+        return list(self._samples)
+
+    def restore(self, samples):
+        """Restore persisted samples."""
+        self._samples = deque(tuple(sample) for sample in samples)
+
+
+class StationAggregates:
+    """Daily extremes, rain and pressure tendency of one station.
+
+    The rain of the last 24 hours adds up the increments of the station's
+    daily precipitation total, which resets at local midnight.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self.epoch = None
+        self._precipitation_total = None
+        self._windows = {
+            "temperature_min_24h": WindowExtreme(DAY),
+            "temperature_max_24h": WindowExtreme(DAY, maximum=True),
+            "wind_gust_max_24h": WindowExtreme(DAY, maximum=True),
+            "precipitation_24h": WindowSum(DAY),
+            "pressure_tendency_3h": WindowChange(PRESSURE_TENDENCY_WINDOW),
+        }
+
+    def add(self, observation):
+        """Add an observation, ignoring the ones already counted."""
+        epoch = observation.epoch
+        if epoch is None or (self.epoch is not None and epoch <= self.epoch):
+            return
+        self.epoch = epoch
+        windows = self._windows
+
+        if observation.temperature is not None:
+            windows["temperature_min_24h"].add(epoch, observation.temperature)
+            windows["temperature_max_24h"].add(epoch, observation.temperature)
+        if observation.wind_gust_speed is not None:
+            windows["wind_gust_max_24h"].add(epoch, observation.wind_gust_speed)
+        if observation.pressure is not None:
+            windows["pressure_tendency_3h"].add(epoch, observation.pressure)
+
+        total = observation.precipitation_total
+        if total is not None:
+            previous = self._precipitation_total
+            if previous is not None:
+                # After the midnight reset the whole total is new rain
+                increment = total if total < previous else total - previous
+                if increment:
+                    windows["precipitation_24h"].add(epoch, increment)
+            self._precipitation_total = total
+
+        for window in windows.values():
+            window.expire(epoch)
+
+    def as_dict(self, now=None):
+        """Return the aggregates at `now`, rounded like the observations.
+
+        The windows only expire when an observation is added, so the values
+        of a station that stopped reporting are expired here.
+        """
+        if now is None:
+            now = time.time()
+        values = {}
+        for key, window in self._windows.items():
+            window.expire(now)
+            value = window.total if isinstance(window, WindowSum) else window.value
+            values[key] = None if value is None else round(value, 2)
+        return values
+
+    def to_dict(self):
+        """Return the state to persist."""
+        return {
+            "epoch": self.epoch,
+            "precipitation_total": self._precipitation_total,
+            "windows": {key: window.to_list() for key, window in self._windows.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, stored):
+        """Restore persisted aggregates."""
+        aggregates = cls()
+        aggregates.epoch = stored.get("epoch")
+        aggregates._precipitation_total = stored.get("precipitation_total")
+        for key, samples in stored.get("windows", {}).items():
+            if key in aggregates._windows:
+                aggregates._windows[key].restore(samples)
+        return aggregates
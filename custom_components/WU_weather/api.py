@@ -0,0 +1,439 @@
+"""Asynchronous client for the WU dashboard page and the weather.com API."""
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import time
+from datetime import timedelta, datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+
+from .governor import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_CURRENT,
+    PRIORITY_SCRAPE,
+    RequestGovernor,
+)
+from .metrics import Metrics
+from .worker import INLINE_PARSE_BYTES, ParseWorker
+
+_LOGGER = logging.getLogger(__name__)
+
+API_BASE_URL = "https://api.weather.com"
+OBSERVATIONS_PATH = "/v2/pws/observations/current"
+FORECAST_PATHS = {
+    "daily": "/v3/wx/forecast/daily/5day",
+    "hourly": "/v3/wx/forecast/hourly/2day",
+}
+HISTORY_PATHS = {
+    "all": "/v2/pws/history/all",
+    "hourly": "/v2/pws/history/hourly",
+    "daily": "/v2/pws/history/daily",
+}
+# The history endpoints end yesterday, today is served by the last 24 hours
+RECENT_OBSERVATIONS_PATH = "/v2/pws/observations/all/1day"
+NEARBY_STATIONS_PATH = "/v3/location/near"
+
+# Total time allowed for a single HTTP request, in seconds
+REQUEST_TIMEOUT = 10
+
+# Time allowed for an api.weather.com request including its hedge, in seconds
+REQUEST_DEADLINE = 6
+
+# A current conditions request still unanswered after the p95 latency is
+# sent a second time, the first answer wins. Bounds of that delay, in seconds
+HEDGE_MIN_DELAY = 1.0
+HEDGE_MAX_DELAY = 3.0
+
+# How long a scraped apiKey is reused before the dashboard page is scraped again
+API_KEY_TTL = timedelta(hours=12)
+
+# Size of the chunks the dashboard page is read in
+CHUNK_SIZE = 16384
+
+# Pause applied after a 429/503 without a usable Retry-After, in seconds
+DEFAULT_RETRY_AFTER = 60
+
+
+class WUApiError(Exception):
+    """Raised when WU or api.weather.com cannot be reached."""
+
+
+class ApiKeyRejected(WUApiError):
+    """Raised when api.weather.com refuses the cached apiKey."""
+
+
+class RateLimited(WUApiError):
+    """Raised when WU or api.weather.com throttles the requests."""
+
+    def __init__(self, message, overloaded=False):
+        """Initialize, overloaded for a 503 that gave no Retry-After."""
+        super().__init__(message)
+        self.overloaded = overloaded
+
+
+class CircuitOpen(WUApiError):
+    """Raised while api.weather.com is considered down."""
+
+
+def retry_after_seconds(value) -> float:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class WUApiClient:
+    """Fetch the apiKey and PWS observations over a shared aiohttp session."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        page_url,
+        compress=True,
+        governor: RequestGovernor | None = None,
+        api_base_url=API_BASE_URL,
+        parse_worker: ParseWorker | None = None,
+    ):
+        """Initialize.
+
+        The page URL and api_base_url can point at a local server serving
+        fixtures, to run the update cycle without the network.
+        Without a parse worker all responses are parsed on the event loop.
+        """
+        self._session = session
+        self.governor = governor or RequestGovernor()
+        self.parse_worker = parse_worker
+        self.metrics = Metrics()
+        self.page_url = page_url
+        self.api_base_url = api_base_url.rstrip("/")
+        self.compress = compress
+        self.api_key = ""
+        self.api_key_expires = datetime.min
+        self._api_key_lock = asyncio.Lock()
+        # Last ETag/Last-Modified and body per cached request, for 304s
+        self._validators = {}
+        self._timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+
+    @property
+    def _headers(self):
+        """Return the headers sent with every request."""
+        if self.compress:
+            return {"Accept-Encoding": "gzip, deflate"}
+        return {"Accept-Encoding": "identity"}
+
+    def invalidate_api_key(self, rejected_key=None):
+        """Forget the cached apiKey so the next call scrapes a fresh one.
+
+        When the rejected key is given, a key that was already replaced by a
+        concurrent request is kept.
+        """
+        if rejected_key is not None and rejected_key != self.api_key:
+            return
+        self.api_key = ""
+        self.api_key_expires = datetime.min
+
+    async def async_fetch_api_key(self):
+        """Stream the dashboard page and extract the apiKey from it.
+
+        The download stops as soon as the app-root-state script is complete.
+        """
+        # Only needed when the cached apiKey expired, not at startup
+        from .parser import ApiKeyExtractor
+
+        extractor = ApiKeyExtractor()
+        await self.governor.async_acquire(PRIORITY_SCRAPE)
+        self.metrics.count("page_scrapes")
+        start = time.perf_counter()
+        parse_seconds = 0.0
+        try:
+            async with self._session.get(
+                self.page_url, timeout=self._timeout, headers=self._headers
+            ) as response:
+                self._check_throttled(response)
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    self.metrics.count("page_bytes", len(chunk))
+                    parse_start = time.perf_counter()
+                    extractor.feed(chunk)
+                    parse_seconds += time.perf_counter() - parse_start
+                    if extractor.done:
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            self.metrics.count("request_failures")
+            raise WUApiError(f"Error communicating with WU: {err}") from err
+
+        self.metrics.count("loop_seconds", parse_seconds)
+        self.metrics.record("page_fetch", time.perf_counter() - start - parse_seconds)
+        self.metrics.record("html_parse", parse_seconds - extractor.extract_seconds)
+        self.metrics.record("key_extraction", extractor.extract_seconds)
+
+        if not extractor.api_key:
+            raise WUApiError("Error parsing weather data: no apiKey in app-root-state")
+
+        self.api_key = extractor.api_key
+        self.api_key_expires = datetime.now() + API_KEY_TTL
+        return self.api_key
+
+    async def async_get_api_key(self):
+        """Return the cached apiKey, scraping the page only when it expired.
+
+        Concurrent callers wait for a single scrape.
+        """
+        async with self._api_key_lock:
+            if self.api_key == "" or datetime.now() >= self.api_key_expires:
+                self.metrics.count("key_cache_misses")
+                await self.async_fetch_api_key()
+            else:
+                self.metrics.count("key_cache_hits")
+            return self.api_key
+
+    def _check_throttled(self, response):
+        """Pause the governor and raise when a response asks to slow down."""
+        if response.status in (429, 503):
+            delay = retry_after_seconds(response.headers.get("Retry-After"))
+            self.governor.defer(delay)
+            raise RateLimited(
+                f"Throttled with status {response.status}, retrying in {delay:.0f}s",
+                # A bare 503 is a failing server rather than a throttling one
+                overloaded=response.status == 503 and "Retry-After" not in response.headers,
+            )
+
+    async def _async_get_json(self, url, params, cache_key, priority):
+        """Request a JSON document from api.weather.com.
+
+        The request is conditional on the previous response, so an unchanged
+        document costs a 304 and the cached body is returned.
+        """
+        headers = dict(self._headers)
+        cached = self._validators.get(cache_key)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        breaker = self.governor.breaker
+        if not breaker.allow():
+            self.metrics.count("circuit_open")
+            raise CircuitOpen("api.weather.com is failing, waiting for the next probe")
+
+        def request():
+            return self._async_read_json(url, params, headers, cache_key, cached)
+
+        await self.governor.async_acquire(priority)
+        self.metrics.count("api_requests")
+        try:
+            with self.metrics.time("api_fetch"):
+                async with asyncio.timeout(REQUEST_DEADLINE):
+                    if priority == PRIORITY_CURRENT:
+                        payload = await self._async_hedged(request, priority)
+                    else:
+                        payload = await request()
+        except aiohttp.ClientResponseError as err:
+            self.metrics.count("request_failures")
+            # A 4xx is an answer, only server errors count as an outage
+            if err.status >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise WUApiError(f"Error communicating with API: {err}") from err
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            self.metrics.count("request_failures")
+            breaker.record_failure()
+            raise WUApiError(f"Error communicating with API: {err}") from err
+        except ValueError as err:
+            self.metrics.count("request_failures")
+            breaker.record_failure()
+            raise WUApiError(f"Invalid response from API: {err}") from err
+        except RateLimited as err:
+            if err.overloaded:
+                breaker.record_failure()
+            else:
+                # A 429, or a 503 saying when to come back, the server is up
+                breaker.record_success()
+            raise
+        except WUApiError:
+            # Rejected apiKey, the server is up
+            breaker.record_success()
+            raise
+        breaker.record_success()
+        return payload
+
+    def _hedge_delay(self) -> float:
+        """Return how long a request may take before it is hedged."""
+        p95 = self.metrics.percentile("api_fetch", 95)
+        if p95 is None:
+            return HEDGE_MAX_DELAY
+        return min(max(p95, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+
+    async def _async_hedged(self, request, priority):
+        """Return the first successful answer of a request or of its hedge.
+
+        The hedge is only sent when the request is slower than usual, and
+        it costs a request from the budget like any other.
+        """
+
+        async def hedge():
+            await self.governor.async_acquire(priority)
+            self.metrics.count("hedged_requests")
+            return await request()
+
+        tasks = [asyncio.ensure_future(request())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay())
+            if not done:
+                tasks.append(asyncio.ensure_future(hedge()))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _async_read_json(self, url, params, headers, cache_key, cached):
+        """Send a request and return its JSON body."""
+        async with self._session.get(
+            url,
+            params=params,
+            timeout=self._timeout,
+            headers=headers,
+        ) as response:
+            if response.status in (401, 403):
+                raise ApiKeyRejected(f"apiKey rejected with status {response.status}")
+            self._check_throttled(response)
+            if response.status == 304 and cached:
+                self.metrics.count("not_modified")
+                return cached[2]
+            response.raise_for_status()
+            if response.status == 204:
+                # The station has not reported recently
+                return {}
+            body = await response.read()
+            self.metrics.count("api_bytes", len(body))
+            payload = await self._async_parse_json(body)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if cache_key is not None and (etag or last_modified):
+                self._validators[cache_key] = (etag, last_modified, payload)
+            return payload
+
+    async def _async_parse_json(self, body):
+        """Parse a JSON body, in the parse worker when it is large."""
+        if self.parse_worker is not None and len(body) >= INLINE_PARSE_BYTES:
+            self.metrics.count("worker_parses")
+            return await self.parse_worker.async_run(json.loads, body)
+        start = time.perf_counter()
+        try:
+            return json.loads(body)
+        finally:
+            self.metrics.count("loop_seconds", time.perf_counter() - start)
+
+    async def _async_get_with_key(self, url, params, cache_key, priority):
+        """Request a JSON document with the cached apiKey.
+
+        A rejected apiKey is dropped, re-scraped and the request retried once.
+        """
+        api_key = await self.async_get_api_key()
+        try:
+            return await self._async_get_json(
+                url, {**params, "apiKey": api_key}, cache_key, priority
+            )
+        except ApiKeyRejected as err:
+            _LOGGER.debug("Cached apiKey rejected, scraping a new one: %s", err)
+            self.invalidate_api_key(api_key)
+            api_key = await self.async_get_api_key()
+            return await self._async_get_json(
+                url, {**params, "apiKey": api_key}, cache_key, priority
+            )
+
+    async def async_get_observations(self, station_id, units="m"):
+        """Return the current observations of a station."""
+        params = {
+            "stationId": station_id,
+            "numericPrecision": "decimal",
+            "format": "json",
+            "units": units,
+        }
+        return await self._async_get_with_key(
+            self.api_base_url + OBSERVATIONS_PATH,
+            params,
+            ("observations", station_id, units),
+            PRIORITY_CURRENT,
+        )
+
+    async def async_get_forecast(self, kind, latitude, longitude):
+        """Return the daily or hourly forecast of a location, in metric units."""
+        geocode = f"{latitude:.2f},{longitude:.2f}"
+        params = {
+            "geocode": geocode,
+            "format": "json",
+            "units": "m",
+            "language": "en-US",
+        }
+        return await self._async_get_with_key(
+            self.api_base_url + FORECAST_PATHS[kind],
+            params,
+            ("forecast", kind, geocode),
+            PRIORITY_BACKGROUND,
+        )
+
+    async def async_get_history(self, station_id, kind, day, units="m"):
+        """Return the all, hourly or daily history of a station for a date.
+
+        History does not change, so the responses are not kept for
+        conditional requests.
+        """
+        params = {
+            "stationId": station_id,
+            "numericPrecision": "decimal",
+            "format": "json",
+            "units": units,
+            "date": day.strftime("%Y%m%d"),
+        }
+        return await self._async_get_with_key(
+            self.api_base_url + HISTORY_PATHS[kind], params, None, PRIORITY_BACKGROUND
+        )
+
+    async def async_get_recent_observations(self, station_id, units="m"):
+        """Return the observation summaries of a station over the last 24 hours."""
+        params = {
+            "stationId": station_id,
+            "numericPrecision": "decimal",
+            "format": "json",
+            "units": units,
+        }
+        return await self._async_get_with_key(
+            self.api_base_url + RECENT_OBSERVATIONS_PATH,
+            params,
+            None,
+            PRIORITY_BACKGROUND,
+        )
+
+    async def async_get_nearby_stations(self, latitude, longitude):
+        """Return the personal weather stations near a location."""
+        params = {
+            "geocode": f"{latitude:.3f},{longitude:.3f}",
+            "product": "pws",
+            "format": "json",
+        }
+        return await self._async_get_with_key(
+            self.api_base_url + NEARBY_STATIONS_PATH, params, None, PRIORITY_BACKGROUND
+        )
@@ -0,0 +1,247 @@
+"""Bulk import of PWS history into the recorder's long-term statistics."""
+from __future__ import annotations
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+
+from homeassistant.const import (
+    PERCENTAGE,
+    UV_INDEX,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+    UnitOfVolumetricFlux,
+)
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .api import WUApiError
+from .const import DOMAIN
+from .decoder import get_decoder
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_BACKFILL = "backfill"
+
+# External statistic IDs must be lower case, <source>:<object id>
+STATISTICS_SOURCE = DOMAIN.lower()
+
+# (Observation field, statistic name, unit) of the imported statistics
+STATISTIC_FIELDS = (
+    ("temperature", "Temperature", UnitOfTemperature.CELSIUS),
+    ("apparent_temperature", "Apparent temperature", UnitOfTemperature.CELSIUS),
+    ("dew_point", "Dew point", UnitOfTemperature.CELSIUS),
+    ("humidity", "Humidity", PERCENTAGE),
+    ("pressure", "Pressure", UnitOfPressure.HPA),
+    ("wind_speed", "Wind speed", UnitOfSpeed.KILOMETERS_PER_HOUR),
+    ("wind_gust_speed", "Wind gust speed", UnitOfSpeed.KILOMETERS_PER_HOUR),
+    ("precipitation", "Precipitation rate", UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR),
+    ("uv_index", "UV index", UV_INDEX),
+)
+
+# Stations backfilled at the same time
+BACKFILL_CONCURRENCY = 4
+
+# Days of one station requested at the same time. They are imported in
+# order, so an interrupted backfill resumes after the last imported day.
+BACKFILL_WINDOW = 7
+
+BACKFILL_SCHEMA = vol.Schema({
+    vol.Optional("stations"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Required("start_date"): cv.date,
+    vol.Optional("end_date"): cv.date,
+    vol.Optional("resolution", default="hourly"): vol.In(["hourly", "all"]),
+})
+
+
+def statistic_id(station_id, key) -> str:
+    """Return the external statistic ID of a field of a station."""
+    return f"{STATISTICS_SOURCE}:{station_id.lower()}_{key}"
+
+
+def hourly_statistics(observations, before=None) -> dict[str, list[StatisticData]]:
+    """Aggregate decoded observations into hourly mean, min and max per field.
+
+    Hours starting at or after the `before` epoch are incomplete and dropped.
+    """
+    buckets = {}
+    for observation in observations:
+        if observation.epoch is None:
+            continue
+        hour = observation.epoch - observation.epoch % 3600
+        if before is not None and hour + 3600 > before:
+            continue
+        bucket = buckets.setdefault(hour, {})
+        for key, _, _ in STATISTIC_FIELDS:
+            value = getattr(observation, key)
+            if value is None:
+                continue
+            aggregate = bucket.get(key)
+            if aggregate is None:
+                bucket[key] = [value, 1, value, value]
+            else:
+                aggregate[0] += value
+                aggregate[1] += 1
+                aggregate[2] = min(aggregate[2], value)
+                aggregate[3] = max(aggregate[3], value)
+
+    rows = {key: [] for key, _, _ in STATISTIC_FIELDS}
+    for hour in sorted(buckets):
+        start = dt_util.utc_from_timestamp(hour)
+        for key, (total, count, low, high) in buckets[hour].items():
+            rows[key].append(
+                {"start": start, "mean": total / count, "min": low, "max": high}
+            )
+    return rows
+
+
+@callback
+def _async_import(hass, station_id, rows):
+    """Queue the hourly rows of a station in the recorder, one job per field."""
+    # The recorder pulls in SQLAlchemy, it is only imported once a backfill runs
+    from homeassistant.components.recorder.statistics import (
+        async_add_external_statistics,
+    )
+
+    for key, name, unit in STATISTIC_FIELDS:
+        if not rows[key]:
+            continue
+        metadata: StatisticMetaData = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": f"{station_id} {name}",
+            "source": STATISTICS_SOURCE,
+            "statistic_id": statistic_id(station_id, key),
+            "unit_of_measurement": unit,
+        }
+        async_add_external_statistics(hass, metadata, rows[key])
+
+
+async def _async_last_imported_day(hass, station_id) -> date | None:
+    """Return the local date of the last hour imported for a station."""
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.statistics import get_last_statistics
+
+    temperature_id = statistic_id(station_id, "temperature")
+    last = await get_instance(hass).async_add_executor_job(
+        get_last_statistics, hass, 1, temperature_id, False, {"mean"}
+    )
+    if not last.get(temperature_id):
+        return None
+    return dt_util.as_local(
+        dt_util.utc_from_timestamp(last[temperature_id][0]["start"])
+    ).date()
+
+
+def resume_day(start, end, last_day) -> date:
+    """Return the first day to import of the range from start to end.
+
+    A backfill resumes from the last imported day, which is fetched again
+    because it may have been incomplete, but only when that day is in the
+    range: an older range is imported from its start.
+    """
+    if last_day is not None and start <= last_day <= end:
+        return last_day
+    return start
+
+
+async def async_backfill_station(hass, client, station_id, start, end, resolution="hourly"):
+    """Import the history of a station between two local dates, inclusive."""
+    start = resume_day(start, end, await _async_last_imported_day(hass, station_id))
+    today = dt_util.now().date()
+    end = min(end, today)
+    decoder = get_decoder("m", summary=True)
+
+    async def fetch(day):
+        if day == today:
+            return await client.async_get_recent_observations(station_id)
+        return await client.async_get_history(station_id, resolution, day)
+
+    imported = 0
+    day = start
+    while day <= end:
+        window = [
+            day + timedelta(days=offset)
+            for offset in range(min(BACKFILL_WINDOW, (end - day).days + 1))
+        ]
+        responses = await asyncio.gather(
+            *(fetch(window_day) for window_day in window), return_exceptions=True
+        )
+        for window_day, response in zip(window, responses):
+            if isinstance(response, BaseException):
+                if not isinstance(response, WUApiError):
+                    raise response
+                _LOGGER.warning(
+                    "Backfill of %s stopped at %s: %s", station_id, window_day, response
+                )
+                return imported
+            observations = response.get("observations") or []
+            if client.parse_worker is not None:
+                observations = await client.parse_worker.async_run(
+                    decoder.decode_many, observations
+                )
+            else:
+                observations = decoder.decode_many(observations)
+            rows = hourly_statistics(observations, dt_util.utcnow().timestamp())
+            _async_import(hass, station_id, rows)
+            imported += 1
+        day = window[-1] + timedelta(days=1)
+    return imported
+
+
+async def async_backfill(hass, clients, start, end, resolution="hourly"):
+    """Backfill several stations, `clients` maps each station to its client."""
+    semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+
+    async def backfill(station_id, client):
+        async with semaphore:
+            days = await async_backfill_station(
+                hass, client, station_id, start, end, resolution
+            )
+            _LOGGER.info("Imported %d days of history of %s", days, station_id)
+
+    await asyncio.gather(
+        *(backfill(station_id, client) for station_id, client in clients.items())
+    )
+
+
+@callback
+def async_setup_services(hass: HomeAssistant):
+    """Register the backfill service."""
+
+    async def handle_backfill(call: ServiceCall):
+        """Start a backfill of the configured stations in the background."""
+        if "recorder" not in hass.config.components:
+            raise HomeAssistantError("The recorder is required to import history")
+
+        clients = {}
+        for coordinator in hass.data.get(DOMAIN, {}).get("coordinators", {}).values():
+            for station_id in coordinator.stations:
+                clients.setdefault(station_id, coordinator.client)
+        requested = [station.upper() for station in call.data.get("stations", [])]
+        unknown = [station for station in requested if station not in clients]
+        if unknown:
+            raise HomeAssistantError(f"Stations not configured: {', '.join(unknown)}")
+        if requested:
+            clients = {station: clients[station] for station in requested}
+
+        start = call.data["start_date"]
+        end = call.data.get("end_date") or dt_util.now().date()
+        if end < start:
+            raise HomeAssistantError("end_date is before start_date")
+        hass.async_create_background_task(
+            async_backfill(hass, clients, start, end, call.data["resolution"]),
+            f"{DOMAIN} backfill",
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKFILL, handle_backfill, schema=BACKFILL_SCHEMA
+    )
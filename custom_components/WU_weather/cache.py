@@ -0,0 +1,93 @@
+"""Response cache shared by every configuration of the integration."""
+from __future__ import annotations
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+
+def normalize_url(url) -> str:
+    """Return a URL without query, fragment and case differences."""
+    parts = urlsplit(url.strip())
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path.rstrip('/').lower()}"
+
+
+class SharedResponseCache:
+    """Single-flight, short TTL cache of responses and shared objects.
+
+    Concurrent requests for the same key wait for one in-flight fetch and
+    its result is served to later requests until it expires. Owners (the
+    coordinators) subscribe to the keys they use, and a key is evicted when
+    its last subscriber is released.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self._entries = {}
+        self._inflight = {}
+        self._objects = {}
+        self._subscribers = {}
+        # Lookups served from an entry, joined to an in-flight fetch or fetched
+        self.stats = {"hits": 0, "joins": 0, "misses": 0}
+
+    def subscribe(self, owner, key):
+        """Record that an owner uses a key."""
+        self._subscribers.setdefault(key, set()).add(owner)
+
+    def release(self, owner):
+        """Drop all subscriptions of an owner and evict keys nobody uses."""
+        for key in list(self._subscribers):
+            subscribers = self._subscribers[key]
+            subscribers.discard(owner)
+            if not subscribers:
+                del self._subscribers[key]
+                self._entries.pop(key, None)
+                self._objects.pop(key, None)
+
+    def shared(self, owner, key, factory):
+        """Return the object stored under a key, creating it when missing."""
+        self.subscribe(owner, key)
+        if key not in self._objects:
+            self._objects[key] = factory()
+        return self._objects[key]
+
+    async def async_get(self, key, fetch, ttl):
+        """Return the cached response of a key, fetching it at most once.
+
+        `fetch` is a coroutine function, `ttl` the seconds a response is served.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.stats["hits"] += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["joins"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._async_fetched(key, ttl, done))
+        # Shield so a cancelled caller does not cancel the other waiters
+        return await asyncio.shield(task)
+
+    def _async_fetched(self, key, ttl, task):
+        """Store the result of a finished fetch."""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if key in self._subscribers:
+            self._entries[key] = (time.monotonic() + ttl, task.result())
+
+
+@callback
+def async_get_shared_cache(hass: HomeAssistant) -> SharedResponseCache:
+    """Return the cache shared by all config entries and YAML platforms."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if "cache" not in domain_data:
+        domain_data["cache"] = SharedResponseCache()
+    return domain_data["cache"]
@@ -7,6 +7,7 @@ from homeassistant import config_entries
 from homeassistant.core import callback
 
 from .const import DOMAIN
+from .governor import DEFAULT_REQUESTS_PER_DAY, DEFAULT_REQUESTS_PER_MINUTE
 
 
 class WUWeatherConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -37,7 +38,7 @@ class WUWeatherConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 {
                     vol.Required("name", default="WU_weather"): str,
                     vol.Required("current_weather_url"): str,
-                    vol.Required("forecast_url"): str,
+                    vol.Optional("stations", default=""): str,
                 }
             ),
             errors=errors,
@@ -53,9 +54,13 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options for the integration."""
+        errors = {}
         if user_input is not None:
-            # Update the config entry with new options.
-            return self.async_create_entry(title="", data=user_input)
+            if user_input.get("local_uploads") and not user_input.get("station_key"):
+                errors["station_key"] = "station_key_required"
+            else:
+                # Update the config entry with new options.
+                return self.async_create_entry(title="", data=user_input)
 
         # Show the options form, pre-filled with current values.
         return self.async_show_form(
@@ -66,10 +71,49 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         "current_weather_url",
                         default=self.config_entry.data.get("current_weather_url"),
                     ): str,
-                    vol.Required(
-                        "forecast_url",
-                        default=self.config_entry.data.get("forecast_url"),
+                    vol.Optional(
+                        "stations",
+                        default=self.config_entry.options.get(
+                            "stations", self.config_entry.data.get("stations", "")
+                        ),
                     ): str,
+                    vol.Optional(
+                        "max_requests_per_minute",
+                        default=self.config_entry.options.get(
+                            "max_requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        "max_requests_per_day",
+                        default=self.config_entry.options.get(
+                            "max_requests_per_day", DEFAULT_REQUESTS_PER_DAY
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        "diagnostic_sensors",
+                        default=self.config_entry.options.get("diagnostic_sensors", False),
+                    ): bool,
+                    vol.Optional(
+                        "local_uploads",
+                        default=self.config_entry.options.get("local_uploads", False),
+                    ): bool,
+                    vol.Optional(
+                        "station_key",
+                        default=self.config_entry.options.get("station_key", ""),
+                    ): str,
+                    vol.Optional(
+                        "forward_uploads",
+                        default=self.config_entry.options.get("forward_uploads", False),
+                    ): bool,
+                    vol.Optional(
+                        "max_staleness",
+                        default=self.config_entry.options.get("max_staleness", 60),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        "failover",
+                        default=self.config_entry.options.get("failover", False),
+                    ): bool,
                 }
             ),
+            errors=errors,
         )
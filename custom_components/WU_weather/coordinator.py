@@ -0,0 +1,741 @@
+"""Data update coordinator for the WU weather integration."""
+from __future__ import annotations
+import asyncio
+import logging
+import random
+import re
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import timedelta, datetime
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .aggregates import StationAggregates
+from .api import WUApiClient, WUApiError
+from .cache import SharedResponseCache, async_get_shared_cache, normalize_url
+from .const import DOMAIN
+from .governor import (
+    DEFAULT_REQUESTS_PER_DAY,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    RequestGovernor,
+)
+from .failover import (
+    FAILOVER_CANDIDATES,
+    NEARBY_INDEX_TTL,
+    build_nearby_index,
+    is_healthy,
+)
+from .metrics import Metrics, hit_rate
+from .push import async_setup_push
+from .worker import ParseWorker
+from .decoder import (
+    Observation,
+    decode_daily_forecast,
+    decode_hourly_forecast,
+    get_decoder,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Define the update interval for the coordinator
+SCAN_INTERVAL = timedelta(minutes=5)
+
+# Bounds of the adaptive update interval
+MIN_SCAN_INTERVAL = timedelta(minutes=1)
+MAX_SCAN_INTERVAL = timedelta(minutes=30)
+
+# How long after the expected report time a station is polled
+REPORT_GRACE = timedelta(seconds=20)
+
+# Random extra delay, as a fraction of the delay, so stations that were
+# configured together drift apart instead of polling in bursts
+POLL_JITTER = 0.1
+
+# How long an observation response is shared between configurations polling
+# the same station
+OBSERVATION_CACHE_TTL = 30
+
+# Version of the cached observations and apiKey in .storage
+STORAGE_VERSION = 1
+
+# Coalesce writes of the cache, observations change every few minutes
+STORAGE_SAVE_DELAY = 60
+
+# Forecasts are issued hourly, there is no point in refreshing them more often
+FORECAST_SCAN_INTERVAL = timedelta(hours=1)
+
+# Stations in the same grid cell (0.1 degree, about 11 km) share a forecast
+FORECAST_GRID_DIGITS = 1
+
+# How long the last observation of a station is served while updates fail
+DEFAULT_MAX_STALENESS = timedelta(hours=1)
+
+# Maximum number of stations fetched from api.weather.com at the same time
+MAX_CONCURRENT_REQUESTS = 8
+
+# Dashboard URLs look like https://www.wunderground.com/dashboard/pws/IAMSTE256
+STATION_URL_RE = re.compile(r"/pws/([A-Za-z0-9]+)")
+
+
+def stations_from_config(config) -> list[str]:
+    """Return the station IDs configured in YAML or a config entry.
+
+    Falls back to the station of the dashboard URL when none are listed.
+    """
+    stations = config.get("stations") or []
+    if isinstance(stations, str):
+        stations = re.split(r"[\s,;]+", stations)
+    stations = [station.strip().upper() for station in stations if station.strip()]
+    if not stations:
+        match = STATION_URL_RE.search(config.get("current_weather_url", ""))
+        if match:
+            stations = [match.group(1).upper()]
+    # Keep the configured order but drop duplicates
+    return list(dict.fromkeys(stations))
+
+
+@dataclass
+class StationSchedule:
+    """Predict when a station will report its next observation."""
+
+    epoch: int | None = None
+    period: float = SCAN_INTERVAL.total_seconds()
+    misses: int = 0
+    due: float = 0.0
+
+    def next_delay(self, epoch, now) -> float:
+        """Record the latest observation time, return seconds until the next poll.
+
+        A new observation schedules the poll just after the next expected
+        report. A stale or unchanged one backs off exponentially.
+        """
+        min_delay = MIN_SCAN_INTERVAL.total_seconds()
+        max_delay = MAX_SCAN_INTERVAL.total_seconds()
+
+        if epoch is not None and (self.epoch is None or epoch > self.epoch):
+            if self.epoch is not None:
+                # Smooth the period so a single late report does not skew it
+                interval = min(max(epoch - self.epoch, min_delay), max_delay)
+                self.period = 0.7 * self.period + 0.3 * interval
+            self.epoch = epoch
+            self.misses = 0
+            delay = epoch + self.period + REPORT_GRACE.total_seconds() - now
+        else:
+            self.misses += 1
+            delay = min_delay * 2 ** (self.misses - 1)
+
+        delay *= 1 + random.uniform(0, POLL_JITTER)
+        delay = min(max(delay, min_delay), max_delay)
+
+        self.due = now + delay
+        return delay
+
+    def pushed(self, epoch, now):
+        """Record an uploaded observation, the station is polled only if uploads stop."""
+        self.epoch = epoch
+        self.misses = 0
+        self.due = now + MAX_SCAN_INTERVAL.total_seconds()
+
+
+@callback
+def async_create_coordinator(hass: HomeAssistant, config, storage_key):
+    """Create the coordinator shared by all stations of one configuration.
+
+    The coordinator is registered in hass.data under its storage key so the
+    platforms and diagnostics can find it.
+    """
+    stations = stations_from_config(config)
+    if not stations:
+        _LOGGER.error(
+            "No station IDs configured and none found in %s",
+            config.get("current_weather_url"),
+        )
+        return None
+
+    # Every request uses the same scraped apiKey, so they share one budget
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if "governor" not in domain_data:
+        domain_data["governor"] = RequestGovernor()
+    governor = domain_data["governor"]
+
+    # Large responses of every configuration are parsed by the same threads
+    if "parse_worker" not in domain_data:
+        worker = domain_data["parse_worker"] = ParseWorker()
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, lambda event: worker.shutdown()
+        )
+    parse_worker = domain_data["parse_worker"]
+
+    # Configurations scraping the same page share one client and its apiKey
+    cache = async_get_shared_cache(hass)
+    url = config.get("current_weather_url")
+    compress = config.get("compress", True)
+    client = cache.shared(
+        storage_key,
+        ("client", normalize_url(url), compress),
+        lambda: WUApiClient(
+            async_get_clientsession(hass),
+            url,
+            compress,
+            governor,
+            parse_worker=parse_worker,
+        ),
+    )
+    coordinator = WeatherUpdateCoordinator(
+        hass,
+        client,
+        stations,
+        storage_key,
+        config.get("units", "m"),
+        cache,
+        config.get("name", "WU Weather"),
+    )
+    if config.get("local_uploads", False):
+        if config.get("station_key"):
+            coordinator.station_key = config["station_key"]
+            async_setup_push(hass)
+        else:
+            _LOGGER.error(
+                "Local uploads of %s need the station key, they stay disabled",
+                coordinator.name,
+            )
+    coordinator.forward_uploads = config.get("forward_uploads", False)
+    if "max_staleness" in config:
+        coordinator.max_staleness = timedelta(minutes=config["max_staleness"])
+    coordinator.failover = config.get("failover", False)
+    coordinator.budget = (
+        config.get("max_requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE),
+        config.get("max_requests_per_day", DEFAULT_REQUESTS_PER_DAY),
+    )
+    domain_data.setdefault("coordinators", {})[storage_key] = coordinator
+    async_update_budget(hass)
+    return coordinator
+
+
+@callback
+def async_update_budget(hass: HomeAssistant):
+    """Apply the most restrictive budget of the configurations set up."""
+    domain_data = hass.data.get(DOMAIN, {})
+    coordinators = domain_data.get("coordinators")
+    if "governor" not in domain_data or not coordinators:
+        return
+    domain_data["governor"].set_budget(
+        min(coordinator.budget[0] for coordinator in coordinators.values()),
+        min(coordinator.budget[1] for coordinator in coordinators.values()),
+    )
+
+
+class WeatherUpdateCoordinator(DataUpdateCoordinator):
+    """Class to manage fetching WU data for a group of stations.
+
+    The data is a dict mapping each station ID to its latest Observation.
+    """
+
+    def __init__(
+        self,
+        hass,
+        client: WUApiClient,
+        stations,
+        storage_key,
+        units="m",
+        cache: SharedResponseCache | None = None,
+        name="WU Weather",
+    ):
+        """Initialize."""
+        self.client = client
+        self.stations = list(stations)
+        self.units = units
+        self._decoder = get_decoder(units)
+        self._store = Store(hass, STORAGE_VERSION, storage_key)
+        # The storage key is unique per configuration, it identifies the
+        # coordinator's subscriptions in the shared cache and its entities
+        self.storage_key = storage_key
+        self._cache = cache or SharedResponseCache()
+        for station_id in self.stations:
+            self._cache.subscribe(self.storage_key, self._observation_key(station_id))
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self._schedules = {station_id: StationSchedule() for station_id in self.stations}
+        # Rolling extremes and totals, updated with every new observation
+        self.aggregates = {
+            station_id: StationAggregates() for station_id in self.stations
+        }
+        # When the stations were last polled, whether or not anything changed
+        self.last_checked: datetime | None = None
+        self.metrics = Metrics()
+        self.consecutive_failures = 0
+        # Called after every update cycle, whether or not an observation changed
+        self._cycle_listeners: list[CALLBACK_TYPE] = []
+        # Requests per minute and per day this configuration allows
+        self.budget = (DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_DAY)
+        # Key the local uploads of the stations must carry, None refuses them
+        self.station_key: str | None = None
+        # Whether uploads of the stations received locally are sent on to WU
+        self.forward_uploads = False
+        self.max_staleness = DEFAULT_MAX_STALENESS
+        # Stations served from their last observation because the update failed
+        self.stale_stations: set[str] = set()
+        # Whether a station that is down is replaced by the nearest healthy one
+        self.failover = False
+        # Configured station -> station currently serving in its place
+        self.substitutes: dict[str, str] = {}
+        # Configured station -> {"updated": epoch, "candidates": [[ID, km], ...]}
+        self._nearby = {}
+        self._nearby_pending = set()
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=name,
+            update_interval=SCAN_INTERVAL,
+            # Only notify entities when a parsed observation actually changed
+            always_update=False,
+        )
+
+    async def async_restore(self):
+        """Restore the last observations and apiKey saved by a previous run."""
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:
+            _LOGGER.warning("Error loading cached weather data: %s", err)
+            return
+        if not stored:
+            return
+
+        if stored.get("api_key") and not self.client.api_key:
+            self.client.api_key = stored["api_key"]
+            self.client.api_key_expires = datetime.fromisoformat(stored["api_key_expires"])
+
+        data = {}
+        for station_id, observation in stored.get("observations", {}).items():
+            if station_id not in self.stations:
+                continue
+            try:
+                data[station_id] = Observation(**observation)
+            except TypeError as err:
+                _LOGGER.debug("Ignoring cached observation of %s: %s", station_id, err)
+        # Observations too old to be served after an outage are not restored
+        data = self._drop_expired(data, time.time())
+        for station_id, observation in data.items():
+            self._schedules[station_id].epoch = observation.epoch
+        if data:
+            self.data = data
+
+        for station_id, aggregates in stored.get("aggregates", {}).items():
+            if station_id in self.aggregates:
+                self.aggregates[station_id] = StationAggregates.from_dict(aggregates)
+
+        self._nearby = {
+            station_id: nearby
+            for station_id, nearby in stored.get("nearby", {}).items()
+            if station_id in self.stations
+        }
+
+    def _data_to_store(self):
+        """Return the observations and apiKey to persist."""
+        return {
+            "api_key": self.client.api_key,
+            "api_key_expires": self.client.api_key_expires.isoformat(),
+            "observations": {
+                station_id: asdict(observation)
+                for station_id, observation in (self.data or {}).items()
+            },
+            "aggregates": {
+                station_id: aggregates.to_dict()
+                for station_id, aggregates in self.aggregates.items()
+            },
+            "nearby": self._nearby,
+        }
+
+    @callback
+    def async_release(self):
+        """Release the coordinator's entries in the shared cache."""
+        self._cache.release(self.storage_key)
+        self.hass.data.get(DOMAIN, {}).get("coordinators", {}).pop(self.storage_key, None)
+        async_update_budget(self.hass)
+
+    def diagnostics(self):
+        """Return the timings and counters of the update cycle."""
+        cache_stats = self._cache.stats
+        client_metrics = self.client.metrics
+        return {
+            "stations": self.stations,
+            "update_interval": self.update_interval.total_seconds(),
+            "last_checked": self.last_checked.isoformat() if self.last_checked else None,
+            "consecutive_failures": self.consecutive_failures,
+            "stale_stations": sorted(self.stale_stations),
+            "substitutes": dict(self.substitutes),
+            "circuit": self.client.governor.breaker.as_dict(),
+            "key_cache_hit_rate": hit_rate(
+                client_metrics.get("key_cache_hits"),
+                client_metrics.get("key_cache_misses"),
+            ),
+            "response_cache_hit_rate": hit_rate(
+                cache_stats["hits"] + cache_stats["joins"], cache_stats["misses"]
+            ),
+            "response_cache": dict(cache_stats),
+            "coordinator": self.metrics.as_dict(),
+            "client": client_metrics.as_dict(),
+        }
+
+    async def _async_failover(self, reported, data, now):
+        """Serve the nearest healthy station in place of the due stations that are down.
+
+        A station is polled at the normal pace while it is replaced, and
+        serves its own observations again as soon as they are recent.
+        """
+        for station_id, observation in reported.items():
+            if is_healthy(observation, now):
+                if self.substitutes.pop(station_id, None) is not None:
+                    _LOGGER.info("Station %s recovered, serving its observations again", station_id)
+                self._async_refresh_nearby(station_id, observation)
+                continue
+
+            substitute = await self._async_find_substitute(station_id)
+            if substitute is None:
+                continue
+            substitute_id, substitute_observation = substitute
+            if self.substitutes.get(station_id) != substitute_id:
+                _LOGGER.warning(
+                    "Station %s is down, serving nearby station %s", station_id, substitute_id
+                )
+            self.substitutes[station_id] = substitute_id
+            data[station_id] = substitute_observation
+            self.stale_stations.discard(station_id)
+            schedule = self._schedules[station_id]
+            schedule.due = min(schedule.due, now + SCAN_INTERVAL.total_seconds())
+
+    async def _async_find_substitute(self, station_id):
+        """Return the nearest candidate with a recent observation, and that observation.
+
+        The current substitute is tried first, so a failover does not
+        flap between candidates.
+        """
+        nearby = self._nearby.get(station_id)
+        if not nearby:
+            return None
+        candidates = [candidate_id for candidate_id, _ in nearby["candidates"]]
+        current = self.substitutes.get(station_id)
+        if current in candidates:
+            candidates.remove(current)
+            candidates.insert(0, current)
+
+        for candidate_id in candidates[:FAILOVER_CANDIDATES]:
+            try:
+                result = await self._async_fetch_station(candidate_id)
+            except WUApiError as err:
+                _LOGGER.debug("Failover candidate %s failed: %s", candidate_id, err)
+                continue
+            observation = self._decoder.decode_latest(result)
+            if is_healthy(observation, time.time()):
+                return candidate_id, observation
+        return None
+
+    @callback
+    def _async_refresh_nearby(self, station_id, observation):
+        """Look up the stations near a station when they are unknown or old."""
+        if observation.latitude is None or observation.longitude is None:
+            return
+        nearby = self._nearby.get(station_id)
+        if nearby and time.time() - nearby["updated"] < NEARBY_INDEX_TTL.total_seconds():
+            return
+        if station_id in self._nearby_pending:
+            return
+        self._nearby_pending.add(station_id)
+        self.hass.async_create_background_task(
+            self._async_build_nearby(station_id, observation.latitude, observation.longitude),
+            f"{DOMAIN} stations near {station_id}",
+        )
+
+    async def _async_build_nearby(self, station_id, latitude, longitude):
+        """Store the candidates of a station, nearest first."""
+        try:
+            response = await self.client.async_get_nearby_stations(latitude, longitude)
+        except WUApiError as err:
+            _LOGGER.debug("Error looking up the stations near %s: %s", station_id, err)
+            return
+        finally:
+            self._nearby_pending.discard(station_id)
+        self._nearby[station_id] = {
+            "updated": time.time(),
+            "candidates": build_nearby_index(response, station_id, latitude, longitude),
+        }
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    def _drop_expired(self, data, now):
+        """Return the observations that are not older than the maximum staleness."""
+        max_age = self.max_staleness.total_seconds()
+        return {
+            station_id: observation
+            for station_id, observation in data.items()
+            if observation.epoch is None or now - observation.epoch <= max_age
+        }
+
+    def _serve_stale(self, message):
+        """Keep serving the last observations when no station could be updated.
+
+        Entities stay available until their observation is older than the
+        maximum staleness, while the stations are retried with a backoff.
+        """
+        now = time.time()
+        for schedule in self._schedules.values():
+            schedule.next_delay(None, now)
+        self._schedule_next_poll(now)
+        data = self._drop_expired(self.data or {}, now)
+        if not data:
+            raise UpdateFailed(message)
+        _LOGGER.warning("Serving the last observations, update failed: %s", message)
+        self.stale_stations = set(self.stations)
+        return data
+
+    def _schedule_next_poll(self, now):
+        """Wake up when the earliest station is expected to have reported."""
+        next_due = min(schedule.due for schedule in self._schedules.values())
+        self.update_interval = timedelta(
+            seconds=min(
+                max(next_due - now, MIN_SCAN_INTERVAL.total_seconds()),
+                MAX_SCAN_INTERVAL.total_seconds(),
+            )
+        )
+
+    @callback
+    def async_push_observation(self, station_id, observation: Observation):
+        """Publish an observation uploaded by a station to the local server.
+
+        The station is not polled while it keeps uploading. Uploads do not
+        carry the location, it is kept from the previous observation.
+        """
+        previous = (self.data or {}).get(station_id)
+        if observation.latitude is None and previous is not None:
+            observation = replace(
+                observation,
+                latitude=previous.latitude,
+                longitude=previous.longitude,
+            )
+        now = time.time()
+        self._schedules[station_id].pushed(observation.epoch, now)
+        self.aggregates[station_id].add(observation)
+        self._schedule_next_poll(now)
+        self.async_set_updated_data({**(self.data or {}), station_id: observation})
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    @callback
+    def async_add_cycle_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for the end of every update cycle, return a function removing it.
+
+        Listeners of the coordinator are only called when an observation
+        changed, the diagnostics change with every cycle.
+        """
+        self._cycle_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._cycle_listeners.remove(update_callback)
+
+        return remove_listener
+
+    def _observation_key(self, station_id):
+        """Return the shared cache key of a station's observations."""
+        return ("observations", station_id, self.units)
+
+    async def _async_fetch_station(self, station_id):
+        """Fetch the observations of one station within the concurrency limit.
+
+        Other configurations polling the same station share the request.
+        """
+        async with self._semaphore:
+            return await self._cache.async_get(
+                self._observation_key(station_id),
+                lambda: self.client.async_get_observations(station_id, self.units),
+                OBSERVATION_CACHE_TTL,
+            )
+
+    async def _async_update_data(self):
+        """Fetch data for all stations and record how long it took."""
+        decode_before = self._decode_seconds()
+        loop_before = self.client.metrics.get("loop_seconds")
+        stale_before = set(self.stale_stations)
+        try:
+            with self.metrics.time("update"):
+                data = await self._async_update_stations()
+        except UpdateFailed:
+            self.consecutive_failures += 1
+            self.stale_stations = set(self.stations)
+            raise
+        else:
+            if self.stale_stations:
+                self.consecutive_failures += 1
+            else:
+                self.consecutive_failures = 0
+            # Stale observations equal the previous data, so the listeners
+            # would not be called, but their stale attribute changed
+            if data == self.data and (self.stale_stations or stale_before):
+                self.async_update_listeners()
+        finally:
+            # Time the cycle kept the event loop busy parsing and decoding
+            self.metrics.record(
+                "loop_stall",
+                self.client.metrics.get("loop_seconds") - loop_before
+                + self._decode_seconds() - decode_before,
+            )
+            for update_callback in list(self._cycle_listeners):
+                update_callback()
+        return data
+
+    def _decode_seconds(self):
+        """Return the total time spent decoding observations."""
+        return self.metrics.get("decode_seconds")
+
+    async def _async_update_stations(self):
+        """Fetch data for the due stations concurrently and parse it."""
+        try:
+            # Make sure a single apiKey is shared before fanning out
+            await self.client.async_get_api_key()
+        except WUApiError as err:
+            return self._serve_stale(str(err))
+
+        # Only poll the stations that are expected to have a new observation
+        now = time.time()
+        due = [
+            station_id for station_id in self.stations
+            if self._schedules[station_id].due <= now + 1
+        ] or [min(self.stations, key=lambda station_id: self._schedules[station_id].due)]
+
+        results = await asyncio.gather(
+            *(self._async_fetch_station(station_id) for station_id in due),
+            return_exceptions=True,
+        )
+
+        data = {
+            station_id: observation
+            for station_id, observation in (self.data or {}).items()
+            if station_id not in due
+        }
+        errors = []
+        self.stale_stations = set()
+        # The observation each due station reported itself, None when it failed
+        reported = {}
+        now = time.time()
+        for station_id, result in zip(due, results):
+            reported[station_id] = None
+            if isinstance(result, Exception):
+                errors.append(f"{station_id}: {result}")
+                self.stale_stations.add(station_id)
+                # Back off from a failing station like from a silent one
+                self._schedules[station_id].next_delay(None, now)
+                # Keep serving the last good observation of this station
+                if self.data and station_id in self.data:
+                    data[station_id] = self.data[station_id]
+                continue
+            try:
+                decode_start = time.perf_counter()
+                observation = self._decoder.decode_latest(result)
+                decode_seconds = time.perf_counter() - decode_start
+                self.metrics.record("decode", decode_seconds)
+                self.metrics.count("decode_seconds", decode_seconds)
+            except Exception as err:
+                errors.append(f"{station_id}: Error parsing weather data: {err}")
+                self.stale_stations.add(station_id)
+                if self.data and station_id in self.data:
+                    data[station_id] = self.data[station_id]
+                continue
+            data[station_id] = observation
+            reported[station_id] = observation
+            self._schedules[station_id].next_delay(observation.epoch, now)
+            self.aggregates[station_id].add(observation)
+
+        if self.failover:
+            await self._async_failover(reported, data, now)
+
+        self.last_checked = datetime.now()
+        self._schedule_next_poll(now)
+        data = self._drop_expired(data, now)
+
+        if errors:
+            if not data:
+                raise UpdateFailed(f"Error fetching data: {'; '.join(errors)}")
+            _LOGGER.warning("Error fetching some stations: %s", "; ".join(errors))
+
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+        return data
+
+
+class ForecastUpdateCoordinator(DataUpdateCoordinator):
+    """Class to manage fetching the forecasts of one geocode grid cell.
+
+    The data is a dict with the "daily" and "hourly" forecast lists.
+    """
+
+    def __init__(self, hass, client: WUApiClient, cell):
+        """Initialize."""
+        self.client = client
+        self.cell = cell
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"WU Forecast {cell[0]},{cell[1]}",
+            update_interval=FORECAST_SCAN_INTERVAL,
+        )
+
+    async def _async_update_data(self):
+        """Fetch the daily and hourly forecasts."""
+        try:
+            daily, hourly = await asyncio.gather(
+                self.client.async_get_forecast("daily", *self.cell),
+                self.client.async_get_forecast("hourly", *self.cell),
+            )
+        except WUApiError as err:
+            raise UpdateFailed(str(err)) from err
+
+        try:
+            return {
+                "daily": decode_daily_forecast(daily),
+                "hourly": decode_hourly_forecast(hourly),
+            }
+        except Exception as err:
+            raise UpdateFailed(f"Error parsing forecast data: {err}") from err
+
+
+def forecast_cell(latitude, longitude):
+    """Return the grid cell a location belongs to."""
+    return (
+        round(latitude, FORECAST_GRID_DIGITS),
+        round(longitude, FORECAST_GRID_DIGITS),
+    )
+
+
+@callback
+def async_acquire_forecast_coordinator(
+    hass: HomeAssistant, client: WUApiClient, latitude, longitude
+) -> ForecastUpdateCoordinator:
+    """Return the forecast coordinator of a location, shared by its grid cell."""
+    forecasts = hass.data.setdefault(DOMAIN, {}).setdefault("forecasts", {})
+    cell = forecast_cell(latitude, longitude)
+    if cell not in forecasts:
+        coordinator = ForecastUpdateCoordinator(hass, client, cell)
+        forecasts[cell] = [coordinator, 0]
+        hass.async_create_task(coordinator.async_refresh())
+    forecasts[cell][1] += 1
+    return forecasts[cell][0]
+
+
+@callback
+def async_release_forecast_coordinator(
+    hass: HomeAssistant, coordinator: ForecastUpdateCoordinator
+) -> None:
+    """Drop a reference to a forecast coordinator, removing it when unused."""
+    forecasts = hass.data.get(DOMAIN, {}).get("forecasts", {})
+    entry = forecasts.get(coordinator.cell)
+    if entry is None or entry[0] is not coordinator:
+        return
+    entry[1] -= 1
+    if entry[1] <= 0:
+        del forecasts[coordinator.cell]
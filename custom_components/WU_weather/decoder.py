@@ -0,0 +1,311 @@
+"""Table driven decoding of weather.com PWS observations."""
+from __future__ import annotations
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from functools import lru_cache
+
+
+@dataclass(frozen=True, slots=True)
+class Observation:
+    """A decoded observation in metric units, None when not reported.
+
+    The observation time and station location are not compared, so two
+    observations with the same measurements are equal.
+    """
+
+    temperature: float | None = None
+    apparent_temperature: float | None = None
+    dew_point: float | None = None
+    humidity: float | None = None
+    pressure: float | None = None
+    wind_speed: float | None = None
+    wind_gust_speed: float | None = None
+    wind_bearing: float | None = None
+    uv_index: float | None = None
+    precipitation: float | None = None
+    precipitation_total: float | None = None
+    epoch: int | None = field(default=None, compare=False)
+    latitude: float | None = field(default=None, compare=False)
+    longitude: float | None = field(default=None, compare=False)
+
+
+# Returned when a station has no observation
+EMPTY_OBSERVATION = Observation()
+
+# Section of an observation holding the unit dependent values, per `units`
+UNIT_SECTIONS = {
+    "m": "metric",
+    "e": "imperial",
+    "h": "uk_hybrid",
+}
+
+
+def f_to_c(fahrenheit):
+    """Convert Fahrenheit to Celsius."""
+    return (fahrenheit - 32) * 5.0/9.0
+
+
+def mph_to_kmh(speed):
+    """Convert miles per hour to kilometers per hour."""
+    return speed * 1.609344
+
+
+def inhg_to_hpa(pressure):
+    """Convert inches of mercury to hectopascals."""
+    return pressure * 33.86389
+
+
+def in_to_mm(length):
+    """Convert inches to millimeters."""
+    return length * 25.4
+
+
+# Conversions to the metric units exposed by the entities, per unit system
+CONVERSIONS = {
+    "m": {},
+    "e": {
+        "temperature": f_to_c,
+        "speed": mph_to_kmh,
+        "pressure": inhg_to_hpa,
+        "length": in_to_mm,
+    },
+    "h": {
+        "speed": mph_to_kmh,
+    },
+}
+
+# (key, in unit section, source field, quantity) of observations/current
+CURRENT_FIELDS = (
+    ("dew_point", True, "dewpt", "temperature"),
+    ("apparent_temperature", True, "windChill", "temperature"),
+    ("precipitation", True, "precipRate", "length"),
+    ("precipitation_total", True, "precipTotal", "length"),
+    ("temperature", True, "temp", "temperature"),
+    ("wind_speed", True, "windSpeed", "speed"),
+    ("wind_gust_speed", True, "windGust", "speed"),
+    ("pressure", True, "pressure", "pressure"),
+    ("humidity", False, "humidity", None),
+    ("wind_bearing", False, "winddir", None),
+    ("uv_index", False, "uv", None),
+    ("epoch", False, "epoch", None),
+    ("latitude", False, "lat", None),
+    ("longitude", False, "lon", None),
+)
+
+# Same keys for the summaries of the history endpoints (observations/all,
+# history/hourly, history/daily)
+SUMMARY_FIELDS = (
+    ("dew_point", True, "dewptAvg", "temperature"),
+    ("apparent_temperature", True, "windchillAvg", "temperature"),
+    ("precipitation", True, "precipRate", "length"),
+    ("precipitation_total", True, "precipTotal", "length"),
+    ("temperature", True, "tempAvg", "temperature"),
+    ("wind_speed", True, "windspeedAvg", "speed"),
+    ("wind_gust_speed", True, "windgustAvg", "speed"),
+    ("pressure", True, "pressureMax", "pressure"),
+    ("humidity", False, "humidityAvg", None),
+    ("wind_bearing", False, "winddirAvg", None),
+    ("uv_index", False, "uvHigh", None),
+    ("epoch", False, "epoch", None),
+    ("latitude", False, "lat", None),
+    ("longitude", False, "lon", None),
+)
+
+# Query parameters of the WU upload protocol (updateweatherstation.php),
+# always imperial. The station location is not uploaded.
+UPLOAD_FIELDS = (
+    ("dew_point", False, "dewptf", "temperature"),
+    ("apparent_temperature", False, "windchillf", "temperature"),
+    ("precipitation", False, "rainin", "length"),
+    ("precipitation_total", False, "dailyrainin", "length"),
+    ("temperature", False, "tempf", "temperature"),
+    ("wind_speed", False, "windspeedmph", "speed"),
+    ("wind_gust_speed", False, "windgustmph", "speed"),
+    ("pressure", False, "baromin", "pressure"),
+    ("humidity", False, "humidity", None),
+    ("wind_bearing", False, "winddir", None),
+    ("uv_index", False, "UV", None),
+    ("epoch", False, "epoch", None),
+)
+
+
+def _missing(observation, section):
+    """Getter of a field the table does not provide."""
+    return None
+
+
+def _compile_field(in_section, source, convert):
+    """Return a getter reading one field from an observation and its section."""
+    if in_section:
+        if convert is None:
+            return lambda observation, section: section.get(source)
+
+        def getter(observation, section):
+            value = section.get(source)
+            return None if value is None else convert(value)
+
+        return getter
+
+    if convert is None:
+        return lambda observation, section: observation.get(source)
+
+    def getter(observation, section):
+        value = observation.get(source)
+        return None if value is None else convert(value)
+
+    return getter
+
+
+class ObservationDecoder:
+    """Decode observations of one unit system into Observation records.
+
+    The getters and conversions of every field are compiled once, in the
+    order of the Observation fields, so decoding an observation is a single
+    pass over the getters.
+    """
+
+    def __init__(self, units="m", field_table=CURRENT_FIELDS):
+        """Initialize."""
+        self.units = units
+        self.section = UNIT_SECTIONS[units]
+        conversions = CONVERSIONS[units]
+        getters = {
+            key: _compile_field(in_section, source, conversions.get(quantity))
+            for key, in_section, source, quantity in field_table
+        }
+        self._getters = tuple(
+            getters.get(observation_field.name, _missing)
+            for observation_field in fields(Observation)
+        )
+
+    def decode(self, observation) -> Observation:
+        """Decode a single observation."""
+        section = observation.get(self.section) or {}
+        return Observation(*[getter(observation, section) for getter in self._getters])
+
+    def decode_many(self, observations) -> list[Observation]:
+        """Decode a batch of observations, e.g. a history response."""
+        decode = self.decode
+        return [decode(observation) for observation in observations]
+
+    def decode_latest(self, response) -> Observation:
+        """Decode the latest observation of an observations response."""
+        observations = response.get("observations")
+        if not observations:
+            return EMPTY_OBSERVATION
+        return self.decode(observations[0])
+
+
+@lru_cache(maxsize=None)
+def get_decoder(units="m", summary=False) -> ObservationDecoder:
+    """Return the shared decoder of a unit system."""
+    return ObservationDecoder(units, SUMMARY_FIELDS if summary else CURRENT_FIELDS)
+
+
+# Home Assistant weather conditions of the weather.com icon codes
+ICON_CONDITIONS = {
+    0: "exceptional",
+    1: "exceptional",
+    2: "exceptional",
+    3: "lightning-rainy",
+    4: "lightning-rainy",
+    5: "snowy-rainy",
+    6: "snowy-rainy",
+    7: "snowy-rainy",
+    8: "snowy-rainy",
+    9: "rainy",
+    10: "snowy-rainy",
+    11: "rainy",
+    12: "rainy",
+    13: "snowy",
+    14: "snowy",
+    15: "snowy",
+    16: "snowy",
+    17: "hail",
+    18: "snowy-rainy",
+    19: "exceptional",
+    20: "fog",
+    21: "fog",
+    22: "exceptional",
+    23: "windy",
+    24: "windy",
+    25: "snowy",
+    26: "cloudy",
+    27: "cloudy",
+    28: "cloudy",
+    29: "partlycloudy",
+    30: "partlycloudy",
+    31: "clear-night",
+    32: "sunny",
+    33: "clear-night",
+    34: "sunny",
+    35: "hail",
+    36: "sunny",
+    37: "lightning-rainy",
+    38: "lightning-rainy",
+    39: "rainy",
+    40: "pouring",
+    41: "snowy",
+    42: "snowy",
+    43: "snowy",
+    45: "rainy",
+    46: "snowy",
+    47: "lightning-rainy",
+}
+
+
+def _item(values, index):
+    """Return values[index], None when the list is missing or too short."""
+    if values is None or index >= len(values):
+        return None
+    return values[index]
+
+
+def _utc_iso(epoch):
+    """Return an epoch as an ISO 8601 UTC timestamp."""
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def decode_daily_forecast(response) -> list[dict]:
+    """Decode a v3 daily forecast into Home Assistant forecast dicts.
+
+    Each day has a day and a night part; the day part of today is empty in
+    the afternoon, then the night part is used.
+    """
+    daypart = (response.get("daypart") or [{}])[0] or {}
+    forecasts = []
+    for index, valid_time in enumerate(response.get("validTimeUtc") or []):
+        part = 2 * index
+        if _item(daypart.get("iconCode"), part) is None:
+            part += 1
+        forecasts.append({
+            "datetime": _utc_iso(valid_time),
+            "condition": ICON_CONDITIONS.get(_item(daypart.get("iconCode"), part)),
+            "native_temperature": _item(response.get("temperatureMax"), index),
+            "native_templow": _item(response.get("temperatureMin"), index),
+            "native_precipitation": _item(response.get("qpf"), index),
+            "precipitation_probability": _item(daypart.get("precipChance"), part),
+            "native_wind_speed": _item(daypart.get("windSpeed"), part),
+            "wind_bearing": _item(daypart.get("windDirection"), part),
+            "humidity": _item(daypart.get("relativeHumidity"), part),
+        })
+    return forecasts
+
+
+def decode_hourly_forecast(response) -> list[dict]:
+    """Decode a v3 hourly forecast into Home Assistant forecast dicts."""
+    forecasts = []
+    for index, valid_time in enumerate(response.get("validTimeUtc") or []):
+        forecasts.append({
+            "datetime": _utc_iso(valid_time),
+            "condition": ICON_CONDITIONS.get(_item(response.get("iconCode"), index)),
+            "is_daytime": _item(response.get("dayOrNight"), index) == "D",
+            "native_temperature": _item(response.get("temperature"), index),
+            "native_precipitation": _item(response.get("qpf"), index),
+            "precipitation_probability": _item(response.get("precipChance"), index),
+            "native_pressure": _item(response.get("pressureMeanSeaLevel"), index),
+            "native_wind_speed": _item(response.get("windSpeed"), index),
+            "wind_bearing": _item(response.get("windDirection"), index),
+            "humidity": _item(response.get("relativeHumidity"), index),
+        })
+    return forecasts
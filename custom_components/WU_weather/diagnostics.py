@@ -0,0 +1,26 @@
+"""Diagnostics support for the WU weather integration."""
+from __future__ import annotations
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+# The scraped apiKey and the station key are credentials, keep them out of downloads
+TO_REDACT = {"api_key", "station_key"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Return the timings, counters and cache hit rates of a config entry."""
+    coordinator = hass.data[DOMAIN]["coordinators"][f"{DOMAIN}.{entry.entry_id}"]
+    return async_redact_data(
+        {
+            "options": {**entry.data, **entry.options},
+            "api_key": coordinator.client.api_key,
+            "update_cycle": coordinator.diagnostics(),
+        },
+        TO_REDACT,
+    )
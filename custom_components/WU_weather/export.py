@@ -0,0 +1,210 @@
+"""Export PWS observations to CSV files partitioned by station and day.
+
+Run outside Home Assistant as a script, for example:
+
+    python custom_components/WU_weather/export.py \
+        --page-url https://www.wunderground.com/dashboard/pws/IAMSTE256 \
+        --stations IAMSTE256 IAMSTE12 --start 2024-01-01 --output wu_export
+
+Each day of a station is written to <output>/<station>/<day>.csv. Days
+already written are skipped, so a re-run only fetches the missing days.
+Today is incomplete and written to <day>.partial.csv, which is replaced
+on every run until the day has ended.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import csv
+import itertools
+import logging
+import os
+import sys
+import types
+from dataclasses import fields
+from datetime import date, datetime, timedelta, timezone
+
+import aiohttp
+
+if not __package__:
+    # Run as a script: import the modules next to this one as a package,
+    # without its __init__, which needs Home Assistant. They must not be
+    # importable as top level modules either.
+    _PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [path for path in sys.path if os.path.abspath(path) != _PACKAGE_DIR]
+    _package = types.ModuleType("WU_weather")
+    _package.__path__ = [_PACKAGE_DIR]
+    sys.modules["WU_weather"] = _package
+    __package__ = "WU_weather"
+
+from .api import WUApiClient, WUApiError
+from .decoder import Observation, get_decoder
+from .governor import (
+    DEFAULT_REQUESTS_PER_DAY,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    RequestGovernor,
+)
+from .worker import ParseWorker
+
+_LOGGER = logging.getLogger(__name__)
+
+# Station days fetched at the same time. Pending days are produced lazily,
+# so memory holds at most this many day responses whatever the range.
+EXPORT_CONCURRENCY = 4
+
+COLUMNS = ("station_id", "time_utc") + tuple(
+    field.name for field in fields(Observation)
+)
+
+
+def partition_path(output, station_id, day, partial=False) -> str:
+    """Return the file of the observations of a station on a day."""
+    suffix = ".partial.csv" if partial else ".csv"
+    return os.path.join(output, station_id, day.isoformat() + suffix)
+
+
+def pending_days(output, stations, start, end, today):
+    """Yield the (station, day) partitions that still have to be written."""
+    for station_id in stations:
+        day = start
+        while day <= end:
+            if day == today or not os.path.exists(partition_path(output, station_id, day)):
+                yield station_id, day
+            day += timedelta(days=1)
+
+
+def observation_rows(station_id, observations, since=None):
+    """Yield the CSV rows of decoded observations, optionally from an epoch."""
+    for observation in observations:
+        if observation.epoch is None or (since is not None and observation.epoch < since):
+            continue
+        time_utc = datetime.fromtimestamp(observation.epoch, timezone.utc).isoformat()
+        yield (station_id, time_utc) + tuple(
+            getattr(observation, column) for column in COLUMNS[2:]
+        )
+
+
+def write_partition(path, station_id, observations, since=None) -> int:
+    """Decode a day of observations and write them, return the rows written.
+
+    The file is written under a temporary name and renamed, so an
+    interrupted export never leaves a partition that looks complete.
+    """
+    decoder = get_decoder("m", summary=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = 0
+    temporary = path + ".tmp"
+    with open(temporary, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        for row in observation_rows(
+            station_id, (decoder.decode(raw) for raw in observations), since
+        ):
+            writer.writerow(row)
+            rows += 1
+    os.replace(temporary, path)
+    return rows
+
+
+async def async_export(client, stations, start, end, output, resolution="hourly"):
+    """Export the observations of stations between two dates, inclusive.
+
+    Returns the number of partitions written.
+    """
+    today = date.today()
+    end = min(end, today)
+    midnight = datetime.combine(today, datetime.min.time()).timestamp()
+    pending = pending_days(output, stations, start, end, today)
+    written = 0
+
+    async def export_day(station_id, day):
+        if day == today:
+            response = await client.async_get_recent_observations(station_id)
+            path = partition_path(output, station_id, day, partial=True)
+            since = midnight
+        else:
+            response = await client.async_get_history(station_id, resolution, day)
+            path = partition_path(output, station_id, day)
+            since = None
+        rows = await client.parse_worker.async_run(
+            write_partition, path, station_id, response.get("observations") or [], since
+        )
+        if day != today:
+            partial = partition_path(output, station_id, day, partial=True)
+            if os.path.exists(partial):
+                os.remove(partial)
+        _LOGGER.debug("Wrote %d observations of %s on %s", rows, station_id, day)
+
+    async def worker():
+        nonlocal written
+        # Workers pull from the same generator, one partition at a time
+        for station_id, day in pending:
+            try:
+                await export_day(station_id, day)
+            except WUApiError as err:
+                _LOGGER.warning("Export of %s on %s failed: %s", station_id, day, err)
+                continue
+            written += 1
+
+    await asyncio.gather(*(worker() for _ in range(EXPORT_CONCURRENCY)))
+    return written
+
+
+async def async_main(args):
+    """Run an export from parsed command line arguments."""
+    parse_worker = ParseWorker()
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = WUApiClient(
+                session,
+                args.page_url,
+                governor=RequestGovernor(args.requests_per_minute, args.requests_per_day),
+                parse_worker=parse_worker,
+            )
+            stations = list(dict.fromkeys(
+                station.upper()
+                for station in itertools.chain.from_iterable(
+                    value.split(",") for value in args.stations
+                )
+                if station
+            ))
+            written = await async_export(
+                client,
+                stations,
+                args.start,
+                args.end or date.today(),
+                args.output,
+                args.resolution,
+            )
+    finally:
+        parse_worker.shutdown()
+    _LOGGER.info("Wrote %d partitions to %s", written, args.output)
+
+
+def main(argv=None):
+    """Parse the command line and run the export."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--page-url", required=True, help="WU dashboard page the apiKey is read from"
+    )
+    parser.add_argument(
+        "--stations", nargs="+", required=True, help="station IDs, space or comma separated"
+    )
+    parser.add_argument("--start", required=True, type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat, help="defaults to today")
+    parser.add_argument("--output", default="wu_export")
+    parser.add_argument("--resolution", choices=["hourly", "all"], default="hourly")
+    parser.add_argument(
+        "--requests-per-minute", type=int, default=DEFAULT_REQUESTS_PER_MINUTE
+    )
+    parser.add_argument("--requests-per-day", type=int, default=DEFAULT_REQUESTS_PER_DAY)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    asyncio.run(async_main(args))
+
+
+if __name__ == "__main__":
+    main()
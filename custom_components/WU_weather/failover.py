@@ -0,0 +1,67 @@
+"""Nearest healthy station to serve while a configured station is down."""
+from __future__ import annotations
+import math
+from datetime import timedelta
+
+from .decoder import EMPTY_OBSERVATION, Observation
+
+# A station whose latest observation is older than this is replaced
+FAILOVER_AGE = timedelta(minutes=15)
+
+# Candidates tried per update before giving up until the next one
+FAILOVER_CANDIDATES = 3
+
+# Candidates further away than this do not represent the station's weather
+MAX_CANDIDATE_DISTANCE_KM = 25
+
+# How long the nearby stations of a station are reused before a new lookup
+NEARBY_INDEX_TTL = timedelta(days=7)
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def distance_km(latitude1, longitude1, latitude2, longitude2) -> float:
+    """Return the great circle distance between two locations."""
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    delta_phi = phi2 - phi1
+    delta_lambda = math.radians(longitude2 - longitude1)
+    a = (
+        math.sin(delta_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def build_nearby_index(response, station_id, latitude, longitude) -> list[list]:
+    """Return the [station ID, distance] of the candidates, nearest first.
+
+    `response` is a v3/location/near answer for the station's location. It
+    lists a handful of stations, so the precomputed order is the index: a
+    failover walks it without any request besides the candidates' own.
+    """
+    location = response.get("location") or {}
+    candidates = {}
+    for candidate_id, candidate_latitude, candidate_longitude in zip(
+        location.get("stationId") or [],
+        location.get("latitude") or [],
+        location.get("longitude") or [],
+    ):
+        if not candidate_id or candidate_latitude is None or candidate_longitude is None:
+            continue
+        candidate_id = candidate_id.upper()
+        if candidate_id == station_id:
+            continue
+        distance = distance_km(latitude, longitude, candidate_latitude, candidate_longitude)
+        if distance <= MAX_CANDIDATE_DISTANCE_KM:
+            candidates[candidate_id] = round(distance, 2)
+    return sorted(([key, value] for key, value in candidates.items()), key=lambda c: c[1])
+
+
+def is_healthy(observation: Observation | None, now) -> bool:
+    """Return whether an observation is recent and has a temperature."""
+    if observation is None or observation == EMPTY_OBSERVATION:
+        return False
+    if observation.epoch is None or observation.temperature is None:
+        return False
+    return now - observation.epoch <= FAILOVER_AGE.total_seconds()
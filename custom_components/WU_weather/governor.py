@@ -0,0 +1,208 @@
+"""Request budget shared by all outbound calls using the scraped apiKey."""
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import time
+
+# Request priorities, lower is served first
+PRIORITY_CURRENT = 0
+PRIORITY_SCRAPE = 1
+PRIORITY_BACKGROUND = 2
+
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_REQUESTS_PER_DAY = 10000
+
+# Consecutive failed requests that open the circuit
+BREAKER_FAILURES = 5
+
+# First and longest pause before probing a failing server, in seconds
+BREAKER_PROBE_INTERVAL = 30
+BREAKER_MAX_PROBE_INTERVAL = 600
+
+
+class TokenBucket:
+    """Allow `capacity` requests per `period` seconds, refilled continuously."""
+
+    def __init__(self, capacity, period):
+        """Initialize."""
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        """Add the tokens accrued since the last call."""
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, now) -> float:
+        """Return the seconds until a token is available."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        """Consume a token."""
+        self._refill(now)
+        self.tokens -= 1
+
+
+class RequestGovernor:
+    """Enforce per-minute and per-day request budgets.
+
+    Requests that cannot be sent right away wait in a priority queue, so
+    current conditions go out before page scrapes and background work. A
+    Retry-After from the server pauses every request until it has passed,
+    and the circuit breaker tracks whether api.weather.com is reachable.
+    """
+
+    def __init__(
+        self,
+        per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+        per_day=DEFAULT_REQUESTS_PER_DAY,
+    ):
+        """Initialize."""
+        self._buckets = [TokenBucket(per_minute, 60), TokenBucket(per_day, 86400)]
+        self._blocked_until = 0.0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._timer = None
+        # Shared like the budget, an outage affects every configuration
+        self.breaker = CircuitBreaker()
+
+    def set_budget(self, per_minute, per_day):
+        """Replace the budget, keeping the tokens already spent.
+
+        A raised budget refills at the new rate, it does not grant a burst.
+        """
+        now = time.monotonic()
+        for index, (capacity, period) in enumerate(((per_minute, 60), (per_day, 86400))):
+            bucket = self._buckets[index]
+            if bucket.capacity == capacity:
+                continue
+            bucket._refill(now)
+            replacement = TokenBucket(capacity, period)
+            replacement.tokens = min(bucket.tokens, capacity)
+            self._buckets[index] = replacement
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._schedule()
+
+    def _wait_time(self, now) -> float:
+        """Return the seconds until the next request may be sent."""
+        return max(
+            self._blocked_until - now,
+            *(bucket.delay(now) for bucket in self._buckets),
+            0.0,
+        )
+
+    def _take(self, now):
+        """Consume a request from every budget."""
+        for bucket in self._buckets:
+            bucket.take(now)
+
+    async def async_acquire(self, priority=PRIORITY_BACKGROUND):
+        """Wait until a request of the given priority may be sent."""
+        now = time.monotonic()
+        if not self._waiters and self._wait_time(now) == 0:
+            self._take(now)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._schedule()
+        await future
+
+    def defer(self, seconds):
+        """Pause all requests, e.g. for the Retry-After of a 429."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._schedule()
+
+    def _schedule(self):
+        """Wake up when the first waiter may be served."""
+        if self._timer is not None or not self._waiters:
+            return
+        delay = self._wait_time(time.monotonic())
+        self._timer = asyncio.get_running_loop().call_later(delay, self._release)
+
+    def _release(self):
+        """Serve waiters in priority order while the budgets allow it."""
+        self._timer = None
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                # The caller was cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            now = time.monotonic()
+            if self._wait_time(now) > 0:
+                break
+            heapq.heappop(self._waiters)
+            self._take(now)
+            future.set_result(None)
+        self._schedule()
+
+
+class CircuitBreaker:
+    """Stop sending requests to a failing server and probe it at intervals.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    requests are refused. Once the probe interval has passed a single probe
+    is let through: its success closes the circuit, its failure doubles the
+    interval, up to BREAKER_MAX_PROBE_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        failure_threshold=BREAKER_FAILURES,
+        probe_interval=BREAKER_PROBE_INTERVAL,
+    ):
+        """Initialize."""
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.failures = 0
+        self.state = "closed"
+        self._interval = probe_interval
+        self._probe_at = 0.0
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent."""
+        if self.state == "closed":
+            return True
+        now = time.monotonic()
+        if now < self._probe_at:
+            return False
+        # Let one probe through, and another one only if it never completes
+        self.state = "half_open"
+        self._probe_at = now + self._interval
+        return True
+
+    def record_success(self):
+        """Close the circuit after a request reached the server."""
+        self.failures = 0
+        self.state = "closed"
+        self._interval = self.probe_interval
+
+    def record_failure(self):
+        """Count a failed request, opening the circuit when it keeps failing."""
+        self.failures += 1
+        if self.state == "half_open":
+            self._interval = min(self._interval * 2, BREAKER_MAX_PROBE_INTERVAL)
+        elif self.failures < self.failure_threshold:
+            return
+        self.state = "open"
+        self._probe_at = time.monotonic() + self._interval
+
+    def as_dict(self):
+        """Return the state of the circuit."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "probe_interval": self._interval,
+        }
@@ -0,0 +1,95 @@
+"""Timings and counters of the update cycle, for diagnostics."""
+from __future__ import annotations
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Number of samples the rolling percentiles are computed over
+SAMPLE_SIZE = 100
+
+
+class RollingStats:
+    """Keep the last samples of a value in a fixed-size buffer."""
+
+    def __init__(self, size=SAMPLE_SIZE):
+        """Initialize."""
+        self._samples = deque(maxlen=size)
+
+    def add(self, value):
+        """Record a sample."""
+        self._samples.append(value)
+
+    @property
+    def last(self):
+        """Return the latest sample."""
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, percent):
+        """Return the nearest-rank percentile of the buffered samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+        return ordered[rank]
+
+    def as_dict(self):
+        """Return the summary of the samples."""
+        return {
+            "count": len(self._samples),
+            "last": self.last,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+        }
+
+
+def hit_rate(hits, misses):
+    """Return the share of hits, None before the first lookup."""
+    total = hits + misses
+    if not total:
+        return None
+    return hits / total
+
+
+class Metrics:
+    """Durations per phase, in seconds, and event counters."""
+
+    def __init__(self):
+        """Initialize."""
+        self.timings = {}
+        self.counters = {}
+
+    def record(self, phase, seconds):
+        """Record the duration of a phase."""
+        if phase not in self.timings:
+            self.timings[phase] = RollingStats()
+        self.timings[phase].add(seconds)
+
+    @contextmanager
+    def time(self, phase):
+        """Record the duration of the wrapped block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def count(self, name, amount=1):
+        """Increment a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def get(self, name):
+        """Return a counter."""
+        return self.counters.get(name, 0)
+
+    def percentile(self, phase, percent):
+        """Return a percentile of a phase duration, None without samples."""
+        stats = self.timings.get(phase)
+        return stats.percentile(percent) if stats else None
+
+    def as_dict(self):
+        """Return all timings and counters."""
+        return {
+            "timings": {phase: stats.as_dict() for phase, stats in self.timings.items()},
+            "counters": dict(self.counters),
+        }
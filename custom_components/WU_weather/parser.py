@@ -0,0 +1,87 @@
+"""Streaming extraction of the apiKey from the WU dashboard page."""
+from __future__ import annotations
+import json
+import time
+from urllib.parse import urlparse, parse_qs
+
+# The page embeds its state as <script id="app-root-state" ...>{...}</script>
+SCRIPT_MARKER = b'id="app-root-state"'
+SCRIPT_END = b"</script>"
+URL_MARKER = b'"u":'
+
+_DECODER = json.JSONDecoder()
+
+
+class ApiKeyExtractor:
+    """Find the apiKey in the dashboard page while it is being downloaded.
+
+    Chunks of the raw page are passed to feed() as they arrive. Only the
+    app-root-state script is buffered, everything before it is dropped, and
+    only the string values of its "u" entries are decoded.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self._buffer = b""
+        self._in_script = False
+        self.api_key = None
+        self.done = False
+        # Time spent decoding the script once it was found, in seconds
+        self.extract_seconds = 0.0
+
+    def feed(self, chunk: bytes) -> str | None:
+        """Consume the next chunk, return the apiKey once it has been found."""
+        if self.done:
+            return self.api_key
+        self._buffer += chunk
+
+        if not self._in_script:
+            start = self._buffer.find(SCRIPT_MARKER)
+            if start == -1:
+                # Keep just enough bytes to match a marker split across chunks
+                self._buffer = self._buffer[-len(SCRIPT_MARKER):]
+                return None
+            body = self._buffer.find(b">", start)
+            if body == -1:
+                return None
+            self._buffer = self._buffer[body + 1:]
+            self._in_script = True
+
+        end = self._buffer.find(SCRIPT_END)
+        if end == -1:
+            return None
+
+        start = time.perf_counter()
+        self.api_key = extract_api_key_from_state(self._buffer[:end])
+        self.extract_seconds = time.perf_counter() - start
+        self._buffer = b""
+        self.done = True
+        return self.api_key
+
+
+def extract_api_key_from_state(state: bytes) -> str | None:
+    """Return the apiKey of the first "u" URL in the app-root-state blob."""
+    text = state.decode("utf-8", errors="replace")
+    marker = URL_MARKER.decode()
+    position = text.find(marker)
+    while position != -1:
+        value_start = position + len(marker)
+        while text[value_start:value_start + 1].isspace():
+            value_start += 1
+        if text[value_start:value_start + 1] == '"':
+            try:
+                url, _ = _DECODER.raw_decode(text, value_start)
+            except ValueError:
+                url = None
+            if url:
+                api_key = parse_qs(urlparse(url).query).get("apiKey")
+                if api_key:
+                    return api_key[0]
+        position = text.find(marker, value_start)
+    return None
+
+
+def extract_api_key(page: bytes) -> str | None:
+    """Return the apiKey from a fully downloaded dashboard page."""
+    extractor = ApiKeyExtractor()
+    return extractor.feed(page)
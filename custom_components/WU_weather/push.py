@@ -0,0 +1,137 @@
+"""Local ingestion of the uploads of a station, in the WU upload protocol."""
+from __future__ import annotations
+import asyncio
+import hmac
+import logging
+import time
+from datetime import datetime, timezone
+
+import aiohttp
+from aiohttp import web
+from yarl import URL
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import REQUEST_TIMEOUT
+from .const import DOMAIN
+from .decoder import UPLOAD_FIELDS, ObservationDecoder
+
+_LOGGER = logging.getLogger(__name__)
+
+UPLOAD_PATH = "/weatherstation/updateweatherstation.php"
+
+# Where uploads are forwarded, rapid fire uploads (realtime=1) have their own host
+WU_UPLOAD_URL = "https://weatherstation.wunderground.com" + UPLOAD_PATH
+WU_RAPIDFIRE_URL = "https://rtupdate.wunderground.com" + UPLOAD_PATH
+
+# Value sent by some stations for a sensor they do not have
+MISSING_VALUE = -9999
+
+UPLOAD_DECODER = ObservationDecoder("e", UPLOAD_FIELDS)
+
+# Upload parameters holding numbers, the others are ignored
+_NUMERIC_PARAMS = frozenset(
+    source for _, _, source, _ in UPLOAD_FIELDS if source != "epoch"
+)
+
+
+def parse_upload(query) -> dict:
+    """Return the numeric values of an upload query and its epoch."""
+    values = {}
+    for key in _NUMERIC_PARAMS:
+        try:
+            value = float(query[key])
+        except (KeyError, ValueError):
+            continue
+        if value != MISSING_VALUE:
+            values[key] = value
+
+    dateutc = query.get("dateutc", "now")
+    if dateutc == "now":
+        values["epoch"] = int(time.time())
+    else:
+        values["epoch"] = int(
+            datetime.strptime(dateutc, "%Y-%m-%d %H:%M:%S")
+            .replace(tzinfo=timezone.utc)
+            .timestamp()
+        )
+    return values
+
+
+class WUUploadView(HomeAssistantView):
+    """Receive the uploads of the configured stations.
+
+    Weather stations cannot authenticate to Home Assistant, so uploads are
+    accepted without a token, but only for the configurations that enabled
+    local uploads and only with the station key they were given.
+    """
+
+    url = UPLOAD_PATH
+    name = "api:wu_weather:upload"
+    requires_auth = False
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize."""
+        self.hass = hass
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle an upload."""
+        station_id = request.query.get("ID", "").upper()
+        password = request.query.get("PASSWORD", "").encode()
+        coordinators = [
+            coordinator
+            for coordinator in self.hass.data.get(DOMAIN, {}).get("coordinators", {}).values()
+            if station_id in coordinator.stations
+            and coordinator.station_key is not None
+            and hmac.compare_digest(password, coordinator.station_key.encode())
+        ]
+        if not coordinators:
+            # The same answer for unknown stations and wrong keys
+            return web.Response(status=401, text="unauthorized\n")
+
+        try:
+            observation = UPLOAD_DECODER.decode(parse_upload(request.query))
+        except ValueError as err:
+            return web.Response(status=400, text=f"invalid upload: {err}\n")
+
+        for coordinator in coordinators:
+            coordinator.async_push_observation(station_id, observation)
+
+        if any(coordinator.forward_uploads for coordinator in coordinators):
+            self.hass.async_create_background_task(
+                _async_forward(self.hass, request.rel_url.raw_query_string, request.query),
+                f"{DOMAIN} forward upload {station_id}",
+            )
+        # The answer WU stations expect
+        return web.Response(text="success\n")
+
+
+async def _async_forward(hass, query_string, query):
+    """Send an upload on to Weather Underground."""
+    url = WU_RAPIDFIRE_URL if query.get("realtime") == "1" else WU_UPLOAD_URL
+    try:
+        async with async_get_clientsession(hass).get(
+            # Forward the query as received, without re-encoding it
+            URL(f"{url}?{query_string}", encoded=True),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+        ) as response:
+            if response.status != 200:
+                _LOGGER.debug("WU refused a forwarded upload: %s", response.status)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        _LOGGER.debug("Error forwarding an upload to WU: %s", err)
+
+
+@callback
+def async_setup_push(hass: HomeAssistant):
+    """Register the upload endpoint, the first time a configuration enables it.
+
+    Views cannot be unregistered, the endpoint refuses uploads once no
+    configuration accepts them anymore.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if domain_data.get("upload_view"):
+        return
+    hass.http.register_view(WUUploadView(hass))
+    domain_data["upload_view"] = True
@@ -0,0 +1,327 @@
+"""Sensor platform for the WU weather integration.
+
+One sensor per measurement and station, plus optional diagnostic sensors of
+the update cycle, all fed by the coordinator of the weather entities.
+"""
+from __future__ import annotations
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    DEGREE,
+    PERCENTAGE,
+    UV_INDEX,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfLength,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+    UnitOfTime,
+    UnitOfVolumetricFlux,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import WeatherUpdateCoordinator
+from .decoder import EMPTY_OBSERVATION, Observation
+from .metrics import hit_rate
+
+# The key of each sensor is the Observation field it reports. The less
+# common measurements start disabled, they can be enabled per station.
+SENSORS = (
+    SensorEntityDescription(
+        key="temperature",
+        name="Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="apparent_temperature",
+        name="Apparent temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="dew_point",
+        name="Dew point",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="humidity",
+        name="Humidity",
+        device_class=SensorDeviceClass.HUMIDITY,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="pressure",
+        name="Pressure",
+        device_class=SensorDeviceClass.ATMOSPHERIC_PRESSURE,
+        native_unit_of_measurement=UnitOfPressure.HPA,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="wind_speed",
+        name="Wind speed",
+        device_class=SensorDeviceClass.WIND_SPEED,
+        native_unit_of_measurement=UnitOfSpeed.KILOMETERS_PER_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="wind_gust_speed",
+        name="Wind gust speed",
+        device_class=SensorDeviceClass.WIND_SPEED,
+        native_unit_of_measurement=UnitOfSpeed.KILOMETERS_PER_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="wind_bearing",
+        name="Wind bearing",
+        native_unit_of_measurement=DEGREE,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="uv_index",
+        name="UV index",
+        native_unit_of_measurement=UV_INDEX,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+    ),
+    SensorEntityDescription(
+        key="precipitation",
+        name="Precipitation rate",
+        device_class=SensorDeviceClass.PRECIPITATION_INTENSITY,
+        native_unit_of_measurement=UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="precipitation_total",
+        name="Precipitation today",
+        device_class=SensorDeviceClass.PRECIPITATION,
+        native_unit_of_measurement=UnitOfLength.MILLIMETERS,
+        # The station resets its total at midnight
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+)
+
+
+def _milliseconds(seconds):
+    """Convert a duration to milliseconds, keeping None."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _percentage(rate):
+    """Convert a hit rate to a percentage, keeping None."""
+    return None if rate is None else round(rate * 100, 1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class WUDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describe a diagnostic sensor and how to read its value."""
+
+    value_fn: Callable[[WeatherUpdateCoordinator], float | None]
+
+
+DIAGNOSTIC_SENSORS = (
+    WUDiagnosticSensorEntityDescription(
+        key="api_fetch_p50",
+        name="API fetch p50",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _milliseconds(
+            coordinator.client.metrics.percentile("api_fetch", 50)
+        ),
+    ),
+    WUDiagnosticSensorEntityDescription(
+        key="api_fetch_p95",
+        name="API fetch p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _milliseconds(
+            coordinator.client.metrics.percentile("api_fetch", 95)
+        ),
+    ),
+    WUDiagnosticSensorEntityDescription(
+        key="page_fetch_p95",
+        name="Page fetch p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _milliseconds(
+            coordinator.client.metrics.percentile("page_fetch", 95)
+        ),
+    ),
+    WUDiagnosticSensorEntityDescription(
+        key="update_p95",
+        name="Update cycle p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _milliseconds(
+            coordinator.metrics.percentile("update", 95)
+        ),
+    ),
+    WUDiagnosticSensorEntityDescription(
+        key="loop_stall_p95",
+        name="Event loop stall p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _milliseconds(
+            coordinator.metrics.percentile("loop_stall", 95)
+        ),
+    ),
+    WUDiagnosticSensorEntityDescription(
+        key="bytes_downloaded",
+        name="Bytes downloaded",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: (
+            coordinator.client.metrics.get("api_bytes")
+            + coordinator.client.metrics.get("page_bytes")
+        ),
+    ),
+    WUDiagnosticSensorEntityDescription(
+        key="key_cache_hit_rate",
+        name="API key cache hit rate",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _percentage(
+            hit_rate(
+                coordinator.client.metrics.get("key_cache_hits"),
+                coordinator.client.metrics.get("key_cache_misses"),
+            )
+        ),
+    ),
+    WUDiagnosticSensorEntityDescription(
+        key="response_cache_hit_rate",
+        name="Response cache hit rate",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _percentage(
+            coordinator.diagnostics()["response_cache_hit_rate"]
+        ),
+    ),
+    WUDiagnosticSensorEntityDescription(
+        key="consecutive_failures",
+        name="Consecutive failures",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.consecutive_failures,
+    ),
+)
+
+
+def _create_entities(coordinator, name, diagnostic_sensors):
+    """Create the measurement sensors of every station of a coordinator."""
+    entities = []
+    for station_id in coordinator.stations:
+        station_name = name if len(coordinator.stations) == 1 else f"{name} {station_id}"
+        entities.extend(
+            WUSensor(coordinator, station_name, station_id, description)
+            for description in SENSORS
+        )
+    if diagnostic_sensors:
+        entities.extend(
+            WUDiagnosticSensor(coordinator, name, description)
+            for description in DIAGNOSTIC_SENSORS
+        )
+    return entities
+
+
+async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
+    """Set up the sensors of a YAML weather platform."""
+    if discovery_info is None:
+        return
+    coordinator = hass.data[DOMAIN]["coordinators"][discovery_info["coordinator"]]
+    async_add_entities(
+        _create_entities(
+            coordinator, coordinator.name, discovery_info.get("diagnostic_sensors", False)
+        )
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the sensors of a config entry."""
+    coordinator = hass.data[DOMAIN]["coordinators"][f"{DOMAIN}.{entry.entry_id}"]
+    async_add_entities(
+        _create_entities(
+            coordinator, coordinator.name, entry.options.get("diagnostic_sensors", False)
+        )
+    )
+
+
+class WUSensor(CoordinatorEntity, SensorEntity):
+    """A measurement of a station."""
+
+    def __init__(self, coordinator, name, station_id, description):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._station_id = station_id
+        self._attr_name = f"{name} {description.name}"
+        self._attr_unique_id = f"{station_id}_{description.key}"
+
+    @property
+    def _observation(self) -> Observation:
+        """Return the latest observation of this sensor's station."""
+        if self.coordinator.data:
+            return self.coordinator.data.get(self._station_id, EMPTY_OBSERVATION)
+        return EMPTY_OBSERVATION
+
+    @property
+    def available(self) -> bool:
+        """Return if the station is part of the latest update."""
+        return super().available and self._observation != EMPTY_OBSERVATION
+
+    @property
+    def native_value(self):
+        """Return the measurement."""
+        return getattr(self._observation, self.entity_description.key)
+
+
+class WUDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """A timing, counter or hit rate of the update cycle."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    entity_description: WUDiagnosticSensorEntityDescription
+
+    def __init__(self, coordinator, name, description):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_name = f"{name} {description.name}"
+        self._attr_unique_id = f"{coordinator.storage_key}_{description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Also refresh after the cycles that changed no observation."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_cycle_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True, the metrics matter most while the updates fail."""
+        return True
+
+    @property
+    def native_value(self):
+        """Return the current value of the metric."""
+        return self.entity_description.value_fn(self.coordinator)
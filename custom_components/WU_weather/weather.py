@@ -1,32 +1,41 @@
 """Platform for weather integration."""
 from __future__ import annotations
 import logging
-from datetime import timedelta, datetime
-import json
+import time
 
 import voluptuous as vol
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse, parse_qs
 
 from homeassistant.components.weather import (
+    Forecast,
     WeatherEntity,
     PLATFORM_SCHEMA,
     WeatherEntityFeature,
 )
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
+    Platform,
     UnitOfTemperature,
     UnitOfSpeed,
     UnitOfPressure,
     UnitOfLength,
 )
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import HomeAssistant, callback
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
+from homeassistant.helpers.discovery import async_load_platform
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .coordinator import (
+    ForecastUpdateCoordinator,
+    async_acquire_forecast_coordinator,
+    async_create_coordinator,
+    async_release_forecast_coordinator,
+    stations_from_config,
 )
+from .governor import DEFAULT_REQUESTS_PER_DAY, DEFAULT_REQUESTS_PER_MINUTE
+from .decoder import EMPTY_OBSERVATION, Observation
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,161 +43,205 @@ _LOGGER = logging.getLogger(__name__)
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Required("current_weather_url"): cv.string,
     vol.Optional("name", default="WU Weather"): cv.string,
+    vol.Optional("stations", default=[]): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("units", default="m"): vol.In(["m", "e", "h"]),
+    vol.Optional("compress", default=True): cv.boolean,
+    vol.Optional(
+        "max_requests_per_minute", default=DEFAULT_REQUESTS_PER_MINUTE
+    ): cv.positive_int,
+    vol.Optional(
+        "max_requests_per_day", default=DEFAULT_REQUESTS_PER_DAY
+    ): cv.positive_int,
+    vol.Optional("diagnostic_sensors", default=False): cv.boolean,
+    vol.Optional("local_uploads", default=False): cv.boolean,
+    vol.Optional("station_key"): cv.string,
+    vol.Optional("forward_uploads", default=False): cv.boolean,
+    vol.Optional("max_staleness", default=60): cv.positive_int,
+    vol.Optional("failover", default=False): cv.boolean,
 })
 
-# Define the update interval for the coordinator
-SCAN_INTERVAL = timedelta(minutes=5)
+
+def yaml_storage_key(config) -> str:
+    """Return the storage key of a YAML configuration.
+
+    Several configurations may keep the default name, their stations tell
+    them apart.
+    """
+    stations = "_".join(sorted(stations_from_config(config)))
+    return f"{DOMAIN}.{slugify(config.get('name'))}_{slugify(stations)}"
+
+
+def _create_entities(coordinator, name):
+    """Create one weather entity per station of the coordinator."""
+    if len(coordinator.stations) == 1:
+        return [WUWeather(coordinator, name, coordinator.stations[0])]
+    return [
+        WUWeather(coordinator, f"{name} {station_id}", station_id)
+        for station_id in coordinator.stations
+    ]
 
 
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
     """Set up the weather platform."""
-    current_weather_url = config.get("current_weather_url")
+    start = time.perf_counter()
     name = config.get("name")
-
-    coordinator = WeatherUpdateCoordinator(hass, current_weather_url)
-    
-    try:
-        # Manually trigger the first refresh to handle potential startup errors
-        await coordinator.async_config_entry_first_refresh()
-    except UpdateFailed as err:
-        # If the first refresh fails, we raise this special exception
-        # to let Home Assistant know it should retry later.
-        raise ConfigEntryNotReady from err
-
-    async_add_entities([WUWeather(coordinator, name)])
-
-
-class WeatherUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching WU data."""
-
-    def __init__(self, hass, current_weather_url):
-        """Initialize."""
-        self.url = current_weather_url
-        self.api_key = ""
-
-        super().__init__(
-            hass,
-            _LOGGER,
-            name="WU Weather",
-            update_interval=SCAN_INTERVAL,
+    storage_key = yaml_storage_key(config)
+    if storage_key in hass.data.get(DOMAIN, {}).get("coordinators", {}):
+        _LOGGER.error(
+            "Ignoring the duplicate configuration %s of stations %s",
+            name,
+            ", ".join(stations_from_config(config)),
         )
-
-    def FtoC(self, fahrenheit):
-        """Convert Fahrenheit to Celsius."""
-        return (fahrenheit - 32) * 5.0/9.0
-
-    def _fetch_data(self):
-        """Fetch data from a URL in a blocking way."""
-        try:
-            response = requests.get(self.url, timeout=10)
-            response.raise_for_status()
-            return response.content
-        except requests.exceptions.RequestException as err:
-            raise UpdateFailed(f"Error communicating with API: {err}")
-    
-    def _fetch_data_with_api(self):
-        """Fetch data from a URL in a blocking way."""
-        try:
-            response = requests.get(f"https://api.weather.com/v2/pws/observations/current?apiKey={self.api_key}&stationId=IAMSTE256&numericPrecision=decimal&format=json&units=m", timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as err:
-            raise UpdateFailed(f"Error communicating with API: {err}")
-
-    async def _async_update_data(self):
-        """Fetch data from API endpoint and parse it."""
-        try:
-            # Fetch data for the user's selected unit system
-            current_page = await self.hass.async_add_executor_job(self._fetch_data)
-            
-            current_soup = BeautifulSoup(current_page, "html.parser")
-            temp_element = current_soup.find("script", id="app-root-state")
-            data={}
-            api_key = ""
-            try:
-                json_object = json.loads(temp_element.get_text())
-                for k in json_object.keys():
-                    if('u' in json_object[k]):
-                        api_key = parse_qs(urlparse(json_object[k]['u']).query).get("apiKey", " ")[0]
-                        print(api_key)
-                        break
-                    
-            except (ValueError, KeyError) as e:
-                _LOGGER.error("Error parsing weather data: %s", e)
-                raise UpdateFailed(f"Error parsing weather data: {e}")
-            
-            if(api_key!=""):
-                self.api_key = api_key
-
-                current_weather = await self.hass.async_add_executor_job(self._fetch_data_with_api)
-                if 'observations' in current_weather and len(current_weather['observations'])>0:
-                    weather_summary = current_weather['observations'][0]
-
-                    if "metric" in weather_summary:
-                        metric = weather_summary['metric']
-                        if "dewpt" in metric:
-                            data["dew_point"] = metric["dewpt"]
-
-                        if "windChill" in metric:
-                            data["apparent_temperature"] = metric["windChill"]
-
-                        if "precipRate" in metric:
-                            data["precipitation"] = metric["precipRate"]
-                            data["precipitation_unit"] = "mm"
-
-                        if "temp" in metric:
-                            data["temperature"] = metric["temp"]
-                            data["temperature_unit"] = "°C"
-
-                        if "windSpeed" in metric:
-                            data["wind_speed"] = metric["windSpeed"]
-                            data["wind_speed_unit"] = "km/h"
-                        
-                        if "windGust" in metric:
-                            data["wind_gust_speed"] = metric["windGust"]
-
-                        if "pressure" in metric:
-                            data["pressure"] = metric["pressure"]
-
-                    if 'humidity' in weather_summary:
-                        data["humidity"] = weather_summary['humidity']
-
-                    if 'winddir' in weather_summary:
-                        data["wind_bearing"] = weather_summary['winddir']
-
-                    if 'uv' in weather_summary:
-                        data["uv_index"] = weather_summary['uv']
-
-                    data['latest_update'] = datetime.now().strftime("%m/%d/%Y, %H:%M:%S")
-
-            
-
-            return data
-        except Exception as err:
-            raise UpdateFailed(f"Error fetching data: {err}")
+        return
+
+    coordinator = async_create_coordinator(hass, config, storage_key)
+    if coordinator is None:
+        return
+
+    # Serve the cached observations right away, the network refresh runs
+    # in the background so a slow or failing WU does not block startup.
+    await coordinator.async_restore()
+    async_add_entities(_create_entities(coordinator, name))
+    coordinator.metrics.record("setup", time.perf_counter() - start)
+    hass.async_create_background_task(
+        coordinator.async_refresh(), f"{DOMAIN} {name} first refresh"
+    )
+
+    # The sensors share the coordinator, they cost no extra requests
+    discovery_info = {
+        "coordinator": storage_key,
+        "diagnostic_sensors": config.get("diagnostic_sensors", False),
+    }
+    hass.async_create_task(
+        async_load_platform(hass, Platform.SENSOR, DOMAIN, discovery_info, config)
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the weather platform from a config entry."""
+    coordinator = hass.data[DOMAIN]["coordinators"][f"{DOMAIN}.{entry.entry_id}"]
+    async_add_entities(_create_entities(coordinator, coordinator.name))
 
 
 class WUWeather(CoordinatorEntity, WeatherEntity):
     """Representation of a WU Weather entity."""
 
-    def __init__(self, coordinator, name):
+    # This changes every cycle, keep it out of the recorder
+    _unrecorded_attributes = frozenset({"last_checked"})
+
+    def __init__(self, coordinator, name, station_id):
         """Initialize the weather entity."""
         super().__init__(coordinator)
         self._name = name
-        # This entity does not provide forecasts from this API endpoint
-        self._attr_supported_features = 0
+        self._station_id = station_id
+        self._forecast_coordinator: ForecastUpdateCoordinator | None = None
+        self._remove_forecast_listener = None
+        self._attr_supported_features = (
+            WeatherEntityFeature.FORECAST_DAILY | WeatherEntityFeature.FORECAST_HOURLY
+        )
 
     @property
     def name(self):
         """Return the name of the sensor."""
         return self._name
 
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the forecast once the station location is known."""
+        await super().async_added_to_hass()
+        self._async_attach_forecast()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Release the shared forecast coordinator."""
+        await super().async_will_remove_from_hass()
+        if self._remove_forecast_listener is not None:
+            self._remove_forecast_listener()
+            self._remove_forecast_listener = None
+        if self._forecast_coordinator is not None:
+            async_release_forecast_coordinator(self.hass, self._forecast_coordinator)
+            self._forecast_coordinator = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated observations."""
+        self._async_attach_forecast()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_attach_forecast(self) -> None:
+        """Share the forecast coordinator of the station's grid cell."""
+        if self._forecast_coordinator is not None:
+            return
+        observation = self._observation
+        if observation.latitude is None or observation.longitude is None:
+            return
+        self._forecast_coordinator = async_acquire_forecast_coordinator(
+            self.hass,
+            self.coordinator.client,
+            observation.latitude,
+            observation.longitude,
+        )
+        self._remove_forecast_listener = self._forecast_coordinator.async_add_listener(
+            self._handle_forecast_update
+        )
+
+    @callback
+    def _handle_forecast_update(self) -> None:
+        """Push updated forecasts to forecast subscribers."""
+        self.hass.async_create_task(self.async_update_listeners(("daily", "hourly")))
+
+    async def async_forecast_daily(self) -> list[Forecast] | None:
+        """Return the daily forecast."""
+        return self._forecast("daily")
+
+    async def async_forecast_hourly(self) -> list[Forecast] | None:
+        """Return the hourly forecast."""
+        return self._forecast("hourly")
+
+    def _forecast(self, kind) -> list[Forecast] | None:
+        """Return a forecast list of the shared forecast coordinator."""
+        if self._forecast_coordinator is None or not self._forecast_coordinator.data:
+            return None
+        return self._forecast_coordinator.data[kind]
+
+    @property
+    def available(self) -> bool:
+        """Return if the station is part of the latest update."""
+        return super().available and self._observation != EMPTY_OBSERVATION
+
+    @property
+    def extra_state_attributes(self):
+        """Return the polling state of the station and its rolling aggregates."""
+        attributes = self.coordinator.aggregates[self._station_id].as_dict()
+        if self.coordinator.last_checked is not None:
+            attributes["last_checked"] = self.coordinator.last_checked.isoformat()
+        # The last update failed and the previous observation is served
+        attributes["stale"] = self._station_id in self.coordinator.stale_stations
+        # A timestamp rather than an age, which would only be as current as
+        # the last state write
+        if self._observation.epoch is not None:
+            attributes["observation_time"] = dt_util.utc_from_timestamp(
+                self._observation.epoch
+            ).isoformat()
+        attributes["max_staleness"] = int(self.coordinator.max_staleness.total_seconds())
+        if self._station_id in self.coordinator.substitutes:
+            attributes["failover_station"] = self.coordinator.substitutes[self._station_id]
+        return attributes
+
+    @property
+    def _observation(self) -> Observation:
+        """Return the latest observation of this entity's station."""
+        if self.coordinator.data:
+            return self.coordinator.data.get(self._station_id, EMPTY_OBSERVATION)
+        return EMPTY_OBSERVATION
+
     @property
     def native_temperature(self) -> float | None:
         """Return the temperature."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("temperature")
-        return None
+        return self._observation.temperature
 
     @property
     def native_temperature_unit(self) -> str:
@@ -198,16 +251,12 @@ class WUWeather(CoordinatorEntity, WeatherEntity):
     @property
     def native_apparent_temperature(self) -> float | None:
         """Return the apparent temperature (feels like)."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("apparent_temperature")
-        return None
+        return self._observation.apparent_temperature
 
     @property
     def native_pressure(self) -> float | None:
         """Return the pressure."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("pressure")
-        return None
+        return self._observation.pressure
 
     @property
     def native_pressure_unit(self) -> str:
@@ -217,16 +266,12 @@ class WUWeather(CoordinatorEntity, WeatherEntity):
     @property
     def humidity(self) -> float | None:
         """Return the humidity."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("humidity")
-        return None
+        return self._observation.humidity
 
     @property
     def native_wind_speed(self) -> float | None:
         """Return the wind speed."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("wind_speed")
-        return None
+        return self._observation.wind_speed
     
     @property
     def native_wind_speed_unit(self) -> str:
@@ -235,30 +280,22 @@ class WUWeather(CoordinatorEntity, WeatherEntity):
     @property
     def wind_bearing(self) -> float | None:
         """Return the wind bearing."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("wind_bearing")
-        return None
+        return self._observation.wind_bearing
 
     @property
     def uv_index(self) -> float | None:
         """Return the UV index."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("uv_index")
-        return None
+        return self._observation.uv_index
 
     @property
     def native_wind_gust_speed(self) -> float | None:
         """Return the wind gust speed."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("wind_gust_speed")
-        return None
+        return self._observation.wind_gust_speed
     
     @property
     def native_total_precipitation(self) -> float | None:
         """Return the total precipitation."""
-        if self.coordinator.data:
-            return self.coordinator.data.get("precipitation")
-        return None
+        return self._observation.precipitation
 
     @property
     def native_precipitation_unit(self) -> str:
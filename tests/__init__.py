@@ -0,0 +1 @@
+"""Tests of the WU weather integration."""
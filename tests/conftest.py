@@ -0,0 +1,61 @@
+"""Fixtures shared by the tests."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from benchmarks.stub_server import StubServer
+from custom_components.WU_weather.api import WUApiClient
+from custom_components.WU_weather.coordinator import WeatherUpdateCoordinator
+from custom_components.WU_weather.governor import RequestGovernor
+
+# No budget, the tests do not wait for the governor
+UNLIMITED = 10**9
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    """Return a Home Assistant instance without any integration set up."""
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+@pytest.fixture
+async def stub():
+    """Return a running stub server serving the synthetic WU responses."""
+    server = StubServer()
+    await server.async_start()
+    yield server
+    await server.async_stop()
+
+
+@pytest.fixture
+def make_coordinator(hass, stub):
+    """Return a factory of coordinators polling the stub server."""
+
+    def make(stations, storage_key="wu_weather_test"):
+        client = WUApiClient(
+            async_get_clientsession(hass),
+            stub.page_url(stations[0]),
+            governor=RequestGovernor(UNLIMITED, UNLIMITED),
+            api_base_url=stub.url,
+        )
+        return WeatherUpdateCoordinator(hass, client, stations, storage_key)
+
+    return make
+
+
+@pytest.fixture
+def make_due():
+    """Return a function making every station of a coordinator due again."""
+
+    def make(coordinator):
+        for schedule in coordinator._schedules.values():
+            schedule.due = 0.0
+        # Drop the responses cached by the last cycle
+        coordinator._cache._entries.clear()
+
+    return make
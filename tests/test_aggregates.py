@@ -0,0 +1,63 @@
+"""Tests of the rolling aggregates."""
+from __future__ import annotations
+
+from custom_components.WU_weather.aggregates import DAY, StationAggregates
+from custom_components.WU_weather.decoder import Observation
+
+START = 1_700_000_000
+
+
+def test_extremes_leave_the_window():
+    """The 24 hour extremes drop values older than a day."""
+    aggregates = StationAggregates()
+    aggregates.add(Observation(temperature=5.0, epoch=START))
+    aggregates.add(Observation(temperature=15.0, epoch=START + 3600))
+    aggregates.add(Observation(temperature=10.0, epoch=START + 7200))
+    assert aggregates.as_dict(START + 7200)["temperature_min_24h"] == 5.0
+    assert aggregates.as_dict(START + 7200)["temperature_max_24h"] == 15.0
+
+    aggregates.add(Observation(temperature=12.0, epoch=START + DAY + 1))
+    assert aggregates.as_dict(START + DAY + 1)["temperature_min_24h"] == 10.0
+    assert aggregates.as_dict(START + DAY + 1)["temperature_max_24h"] == 15.0
+
+
+def test_rain_survives_midnight_reset():
+    """The daily total restarting at midnight counts as new rain."""
+    aggregates = StationAggregates()
+    for offset, total in ((0, 1.0), (600, 3.0), (1200, 0.5), (1800, 0.5)):
+        aggregates.add(Observation(precipitation_total=total, epoch=START + offset))
+    assert aggregates.as_dict(START + 1800)["precipitation_24h"] == 2.5
+
+
+def test_pressure_tendency_needs_full_window():
+    """The tendency is unknown until three hours are covered."""
+    aggregates = StationAggregates()
+    aggregates.add(Observation(pressure=1010.0, epoch=START))
+    aggregates.add(Observation(pressure=1012.0, epoch=START + 3600))
+    assert aggregates.as_dict(START + 3600)["pressure_tendency_3h"] is None
+    aggregates.add(Observation(pressure=1013.5, epoch=START + 3 * 3600))
+    assert aggregates.as_dict(START + 3 * 3600)["pressure_tendency_3h"] == 3.5
+
+
+def test_old_observations_ignored_and_round_trip():
+    """An observation already counted is ignored, the state persists."""
+    aggregates = StationAggregates()
+    aggregates.add(Observation(temperature=5.0, epoch=START))
+    aggregates.add(Observation(temperature=-20.0, epoch=START))
+    restored = StationAggregates.from_dict(aggregates.to_dict())
+    assert restored.as_dict(START) == aggregates.as_dict(START)
+    assert restored.as_dict(START)["temperature_min_24h"] == 5.0
+
+
+def test_silent_station_expires_when_read():
+    """The windows expire when read, not only when an observation arrives."""
+    aggregates = StationAggregates()
+    aggregates.add(Observation(temperature=5.0, precipitation_total=0.0, epoch=START))
+    aggregates.add(Observation(temperature=7.0, precipitation_total=2.0, epoch=START + 600))
+    assert aggregates.as_dict(START + DAY)["temperature_max_24h"] == 7.0
+    assert aggregates.as_dict(START + DAY)["precipitation_24h"] == 2.0
+
+    values = aggregates.as_dict(START + DAY + 600)
+    assert values["temperature_min_24h"] is None
+    assert values["temperature_max_24h"] is None
+    assert values["precipitation_24h"] == 0.0
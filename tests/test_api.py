@@ -0,0 +1,28 @@
+"""Tests of the api.weather.com client against the stub server."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.WU_weather.api import RateLimited
+
+
+async def test_only_throttling_keeps_the_breaker_closed(stub, make_coordinator):
+    """A 429 or a 503 with Retry-After is an answer, a bare 503 a failure."""
+    client = make_coordinator(["IAMSTE256"]).client
+    breaker = client.governor.breaker
+    await client.async_get_api_key()
+    stub.failing.add("IAMSTE256")
+
+    breaker.record_failure()
+    for status in (429, 503):
+        stub.failure_status = status
+        stub.failure_headers = {"Retry-After": "0"}
+        with pytest.raises(RateLimited):
+            await client.async_get_observations("IAMSTE256")
+        assert breaker.failures == 0
+
+    # Last, the governor now pauses for the default Retry-After
+    stub.failure_headers = {}
+    with pytest.raises(RateLimited):
+        await client.async_get_observations("IAMSTE256")
+    assert breaker.failures == 1
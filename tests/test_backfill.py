@@ -0,0 +1,85 @@
+"""Tests of the history backfill."""
+from __future__ import annotations
+
+from datetime import date
+
+from custom_components.WU_weather import backfill
+from custom_components.WU_weather.backfill import hourly_statistics, resume_day
+from custom_components.WU_weather.decoder import Observation
+
+HOUR = 1715680800  # 2024-05-14 10:00 UTC
+
+
+def test_hourly_statistics():
+    """Observations are aggregated per hour into mean, min and max."""
+    rows = hourly_statistics([
+        Observation(temperature=10.0, humidity=80.0, epoch=HOUR + 60),
+        Observation(temperature=14.0, epoch=HOUR + 1800),
+        Observation(temperature=20.0, epoch=HOUR + 3600),
+        Observation(temperature=99.0),
+    ])
+    assert [row["start"].timestamp() for row in rows["temperature"]] == [HOUR, HOUR + 3600]
+    first = rows["temperature"][0]
+    assert (first["mean"], first["min"], first["max"]) == (12.0, 10.0, 14.0)
+    # Missing values do not count towards the mean
+    assert [row["mean"] for row in rows["humidity"]] == [80.0]
+    assert rows["pressure"] == []
+
+
+def test_hourly_statistics_drops_incomplete_hours():
+    """The hour still running at `before` is left for a later import."""
+    rows = hourly_statistics(
+        [Observation(temperature=10.0, epoch=HOUR), Observation(temperature=12.0, epoch=HOUR + 3600)],
+        before=HOUR + 3900,
+    )
+    assert [row["start"].timestamp() for row in rows["temperature"]] == [HOUR]
+
+
+def test_resume_day():
+    """Only a last imported day within the range moves its start."""
+    start, end = date(2024, 1, 1), date(2024, 1, 31)
+    assert resume_day(start, end, None) == start
+    assert resume_day(start, end, date(2024, 1, 10)) == date(2024, 1, 10)
+    # Data imported up to June does not skip an import of January
+    assert resume_day(start, end, date(2024, 6, 30)) == start
+    assert resume_day(start, end, date(2023, 12, 31)) == start
+
+
+class HistoryClient:
+    """Answer history requests with no observations, remembering the days."""
+
+    parse_worker = None
+
+    def __init__(self):
+        self.days = []
+
+    async def async_get_history(self, station_id, resolution, day):
+        self.days.append(day)
+        return {"observations": []}
+
+
+async def test_backfill_of_older_range(hass, monkeypatch):
+    """A range before the imported data is fetched entirely."""
+    async def last_imported_day(hass, station_id):
+        return date(2024, 6, 30)
+
+    monkeypatch.setattr(backfill, "_async_last_imported_day", last_imported_day)
+    monkeypatch.setattr(backfill, "_async_import", lambda hass, station_id, rows: None)
+    client = HistoryClient()
+    imported = await backfill.async_backfill_station(
+        hass, client, "IAMSTE256", date(2023, 1, 1), date(2023, 1, 10)
+    )
+    assert imported == 10
+    assert client.days[0] == date(2023, 1, 1)
+
+    # Resuming a range imported up to its fifth day fetches that day again
+    async def last_imported_day(hass, station_id):
+        return date(2023, 1, 5)
+
+    monkeypatch.setattr(backfill, "_async_last_imported_day", last_imported_day)
+    client = HistoryClient()
+    imported = await backfill.async_backfill_station(
+        hass, client, "IAMSTE256", date(2023, 1, 1), date(2023, 1, 10)
+    )
+    assert imported == 6
+    assert client.days[0] == date(2023, 1, 5)
@@ -0,0 +1,108 @@
+"""Tests of the response cache shared by the configurations."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.WU_weather import cache
+from custom_components.WU_weather.cache import SharedResponseCache, normalize_url
+
+
+class Fetcher:
+    """Count the fetches and let the test decide when they finish."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return {"fetch": self.calls}
+
+
+def test_normalize_url():
+    """Query, fragment, trailing slash and case do not matter."""
+    assert normalize_url(" HTTPS://WWW.Wunderground.com/Dashboard/PWS/IAMSTE256/?cm_ven=x#top") == (
+        "https://www.wunderground.com/dashboard/pws/iamste256"
+    )
+
+
+async def test_concurrent_callers_share_one_fetch():
+    """Callers arriving while a fetch is in flight join it."""
+    responses = SharedResponseCache()
+    responses.subscribe("home", "key")
+    fetch = Fetcher()
+    waiters = [asyncio.ensure_future(responses.async_get("key", fetch, 30)) for _ in range(3)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+    assert await asyncio.gather(*waiters) == [{"fetch": 1}] * 3
+    assert fetch.calls == 1
+    assert responses.stats == {"hits": 0, "joins": 2, "misses": 1}
+
+
+async def test_ttl(monkeypatch):
+    """A response is served until it expires, then fetched again."""
+    now = 1000.0
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+    responses = SharedResponseCache()
+    responses.subscribe("home", "key")
+    fetch = Fetcher()
+    fetch.release.set()
+
+    assert await responses.async_get("key", fetch, 30) == {"fetch": 1}
+    now += 29
+    assert await responses.async_get("key", fetch, 30) == {"fetch": 1}
+    assert responses.stats["hits"] == 1
+    now += 2
+    assert await responses.async_get("key", fetch, 30) == {"fetch": 2}
+    assert fetch.calls == 2
+
+
+async def test_unsubscribed_key_not_stored():
+    """A key nobody subscribes to is fetched but not kept."""
+    responses = SharedResponseCache()
+    fetch = Fetcher()
+    fetch.release.set()
+    await responses.async_get("key", fetch, 30)
+    await responses.async_get("key", fetch, 30)
+    assert fetch.calls == 2
+    assert "key" not in responses._entries
+
+
+async def test_release_evicts_last_owner():
+    """Entries and shared objects stay while any owner still uses them."""
+    responses = SharedResponseCache()
+    fetch = Fetcher()
+    fetch.release.set()
+    client = responses.shared("home", "client", object)
+    assert responses.shared("garden", "client", object) is client
+    responses.subscribe("home", "key")
+    responses.subscribe("garden", "key")
+    await responses.async_get("key", fetch, 30)
+
+    responses.release("home")
+    assert "key" in responses._entries
+    assert responses.shared("garden", "client", object) is client
+
+    responses.release("garden")
+    assert responses._entries == {}
+    assert responses._objects == {}
+    assert responses.shared("garden", "client", object) is not client
+
+
+async def test_cancelled_waiter_does_not_cancel_others():
+    """The shared fetch outlives a caller that gave up."""
+    responses = SharedResponseCache()
+    responses.subscribe("home", "key")
+    fetch = Fetcher()
+    first = asyncio.ensure_future(responses.async_get("key", fetch, 30))
+    second = asyncio.ensure_future(responses.async_get("key", fetch, 30))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    fetch.release.set()
+    assert await second == {"fetch": 1}
+    assert fetch.calls == 1
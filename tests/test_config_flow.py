@@ -0,0 +1,14 @@
+"""Tests of the config and options flows."""
+from __future__ import annotations
+
+from custom_components.WU_weather.config_flow import WUWeatherConfigFlow
+
+
+async def test_no_forecast_url(hass):
+    """The forecasts follow the stations, no forecast URL is asked."""
+    flow = WUWeatherConfigFlow()
+    flow.hass = hass
+    result = await flow.async_step_user()
+    assert [str(key) for key in result["data_schema"].schema] == [
+        "name", "current_weather_url", "stations"
+    ]
@@ -0,0 +1,124 @@
+"""Tests of the update cycle, driven end to end through the stub server."""
+from __future__ import annotations
+
+import time
+from dataclasses import replace
+
+from custom_components.WU_weather.const import DOMAIN
+from custom_components.WU_weather.coordinator import (
+    MIN_SCAN_INTERVAL,
+    POLL_JITTER,
+    REPORT_GRACE,
+    StationSchedule,
+    async_create_coordinator,
+)
+
+STATIONS = ["IAMSTE256", "IAMSTE12", "INOORD42"]
+
+
+def test_schedule_follows_report_times():
+    """A new observation schedules the poll just after the next report."""
+    schedule = StationSchedule()
+    delay = schedule.next_delay(1000, 1000)
+    expected = schedule.period + REPORT_GRACE.total_seconds()
+    assert expected <= delay <= expected * (1 + POLL_JITTER)
+    assert schedule.due == 1000 + delay
+
+
+def test_schedule_backs_off_when_silent():
+    """Unchanged observations double the delay from the minimum interval."""
+    schedule = StationSchedule()
+    schedule.next_delay(1000, 1000)
+    minimum = MIN_SCAN_INTERVAL.total_seconds()
+    for misses in range(3):
+        delay = schedule.next_delay(1000, 2000)
+        assert minimum * 2**misses <= delay <= minimum * 2**misses * (1 + POLL_JITTER)
+
+
+async def test_update_cycle(stub, make_coordinator, make_due):
+    """One scrape serves the apiKey, every station is decoded."""
+    coordinator = make_coordinator(STATIONS)
+    data = await coordinator._async_update_data()
+    assert sorted(data) == sorted(STATIONS)
+    assert data["IAMSTE12"].temperature == 16.4
+    assert stub.requests == {"page": 1, "observations": 3}
+    assert coordinator.stale_stations == set()
+
+    coordinator.data = data
+    make_due(coordinator)
+    await coordinator._async_update_data()
+    assert stub.requests == {"page": 1, "observations": 6}
+    assert coordinator.client.metrics.get("page_scrapes") == 1
+
+
+async def test_failing_station_keeps_last_observation(stub, make_coordinator, make_due):
+    """A station that fails is served from its last observation."""
+    coordinator = make_coordinator(STATIONS)
+    coordinator.data = await coordinator._async_update_data()
+    previous = coordinator.data["INOORD42"]
+
+    stub.failing.add("INOORD42")
+    make_due(coordinator)
+    data = await coordinator._async_update_data()
+    assert data["INOORD42"] is previous
+    assert coordinator.stale_stations == {"INOORD42"}
+    assert coordinator.consecutive_failures == 1
+
+
+async def test_budget_follows_configurations(hass, stub):
+    """The shared budget is the tightest of the configurations set up."""
+    def create(key, per_minute, per_day):
+        config = {
+            "current_weather_url": stub.page_url(),
+            "max_requests_per_minute": per_minute,
+            "max_requests_per_day": per_day,
+        }
+        return async_create_coordinator(hass, config, key)
+
+    def capacities():
+        return [bucket.capacity for bucket in hass.data[DOMAIN]["governor"]._buckets]
+
+    strict = create("strict", 10, 5000)
+    create("loose", 60, 20000)
+    assert capacities() == [10, 5000]
+
+    # Releasing the strict configuration raises the budget again
+    strict.async_release()
+    assert capacities() == [60, 20000]
+    create("strict", 20, 8000)
+    assert capacities() == [20, 8000]
+
+
+async def test_stale_stations_notify_listeners(stub, make_coordinator, make_due):
+    """Serving the last observation updates the stale attributes."""
+    coordinator = make_coordinator(STATIONS)
+    await coordinator.async_refresh()
+    calls = []
+    coordinator.async_add_listener(lambda: calls.append(set(coordinator.stale_stations)))
+
+    stub.failing.add("INOORD42")
+    make_due(coordinator)
+    await coordinator.async_refresh()
+    assert calls == [{"INOORD42"}]
+
+    # Recovered with the same observation: the stale attribute is cleared
+    stub.failing.clear()
+    make_due(coordinator)
+    await coordinator.async_refresh()
+    assert calls == [{"INOORD42"}, set()]
+
+
+async def test_restore_drops_expired_observations(make_coordinator):
+    """Observations older than the maximum staleness are not restored."""
+    coordinator = make_coordinator(STATIONS)
+    await coordinator.async_refresh()
+    now = time.time()
+    coordinator.data = {
+        "IAMSTE256": replace(coordinator.data["IAMSTE256"], epoch=int(now) - 60),
+        "IAMSTE12": replace(coordinator.data["IAMSTE12"], epoch=int(now) - 7200),
+    }
+    await coordinator._store.async_save(coordinator._data_to_store())
+
+    restored = make_coordinator(STATIONS)
+    await restored.async_restore()
+    assert list(restored.data) == ["IAMSTE256"]
@@ -0,0 +1,74 @@
+"""Tests of the table driven observation decoder."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from benchmarks.stub_server import OBSERVATIONS_FIXTURE
+from custom_components.WU_weather.decoder import (
+    EMPTY_OBSERVATION,
+    UPLOAD_FIELDS,
+    ObservationDecoder,
+    get_decoder,
+)
+
+RESPONSE = json.loads(OBSERVATIONS_FIXTURE.read_bytes())
+
+
+def test_decodes_synthetic_metric_observation():
+    """Every field is read from its section of a metric observation."""
+    observation = get_decoder("m").decode_latest(RESPONSE)
+    assert observation.temperature == 16.4
+    assert observation.dew_point == 11.1
+    assert observation.humidity == 71.0
+    assert observation.pressure == 1016.26
+    assert observation.wind_speed == 9.4
+    assert observation.wind_gust_speed == 13.7
+    assert observation.wind_bearing == 243
+    assert observation.precipitation_total == 0.30
+    assert observation.epoch == 1715680502
+    assert (observation.latitude, observation.longitude) == (52.301, 4.862)
+
+
+def test_converts_imperial_to_metric():
+    """Imperial observations are converted to the metric entity units."""
+    observation = get_decoder("e").decode(
+        {"imperial": {"temp": 50.0, "windSpeed": 10.0, "pressure": 30.0, "precipTotal": 1.0}}
+    )
+    assert observation.temperature == pytest.approx(10.0)
+    assert observation.wind_speed == pytest.approx(16.09344)
+    assert observation.pressure == pytest.approx(1015.9167)
+    assert observation.precipitation_total == pytest.approx(25.4)
+
+
+def test_missing_values_are_none():
+    """Fields that are not reported decode to None."""
+    observation = get_decoder("m").decode({"metric": {"temp": 1.0}})
+    assert observation.temperature == 1.0
+    assert observation.humidity is None
+    assert observation.pressure is None
+
+
+def test_empty_response():
+    """A station without observations decodes to the empty sentinel."""
+    assert get_decoder("m").decode_latest({}) is EMPTY_OBSERVATION
+    assert get_decoder("m").decode_latest({"observations": []}) is EMPTY_OBSERVATION
+
+
+def test_equality_ignores_time_and_location():
+    """Only the measurements are compared to detect a change."""
+    decoder = get_decoder("m")
+    observation = RESPONSE["observations"][0]
+    later = {**observation, "epoch": observation["epoch"] + 300, "lat": 0.0}
+    assert decoder.decode(observation) == decoder.decode(later)
+
+
+def test_upload_fields():
+    """Uploads are flat imperial query parameters."""
+    observation = ObservationDecoder("e", UPLOAD_FIELDS).decode(
+        {"tempf": 32.0, "humidity": 55.0, "epoch": 1700000000}
+    )
+    assert observation.temperature == pytest.approx(0.0)
+    assert observation.humidity == 55.0
+    assert observation.epoch == 1700000000
@@ -0,0 +1,28 @@
+"""Tests of the diagnostics download."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+
+from custom_components.WU_weather.const import DOMAIN
+from custom_components.WU_weather.diagnostics import async_get_config_entry_diagnostics
+
+
+async def test_credentials_redacted(hass, stub, make_coordinator):
+    """Neither the apiKey nor the station key is downloaded."""
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Home",
+        data={"current_weather_url": stub.page_url()},
+        options={"local_uploads": True, "station_key": "s3cret"},
+        source="user",
+    )
+    coordinator = make_coordinator(["IAMSTE256"])
+    await coordinator.client.async_get_api_key()
+    hass.data[DOMAIN] = {"coordinators": {f"{DOMAIN}.{entry.entry_id}": coordinator}}
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["options"]["station_key"] == "**REDACTED**"
+    assert diagnostics["api_key"] == "**REDACTED**"
+    assert "s3cret" not in str(diagnostics)
@@ -0,0 +1,144 @@
+"""Tests of the standalone export script."""
+from __future__ import annotations
+
+import csv
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from custom_components.WU_weather import export
+from custom_components.WU_weather.export import (
+    COLUMNS,
+    async_export,
+    partition_path,
+    pending_days,
+    write_partition,
+)
+
+DAY = date(2024, 5, 14)
+
+EXPORT = Path(__file__).parent.parent / "custom_components" / "WU_weather" / "export.py"
+
+
+def test_export_runs_without_home_assistant(tmp_path):
+    """The script imports its modules without the package __init__."""
+    blocked = tmp_path / "homeassistant"
+    blocked.mkdir()
+    (blocked / "__init__.py").write_text('raise ImportError("Home Assistant is not installed")\n')
+    result = subprocess.run(
+        [sys.executable, str(EXPORT), "--help"],
+        env={"PYTHONPATH": str(tmp_path)},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "--page-url" in result.stdout
+
+
+class FakeClient:
+    """Serve a day of observations of any station, parsing inline."""
+
+    def __init__(self):
+        self.requests = []
+        self.parse_worker = self
+
+    async def async_run(self, function, *args):
+        return function(*args)
+
+    def _observations(self, station_id, day):
+        midnight = datetime.combine(day, datetime.min.time()).timestamp()
+        return {"observations": [
+            {"stationID": station_id, "epoch": int(midnight) + hour * 3600,
+             "metric": {"tempAvg": 10.0 + hour}}
+            for hour in range(3)
+        ]}
+
+    async def async_get_history(self, station_id, resolution, day):
+        self.requests.append(("history", station_id, day))
+        return self._observations(station_id, day)
+
+    async def async_get_recent_observations(self, station_id):
+        self.requests.append(("recent", station_id, export.date.today()))
+        return self._observations(station_id, export.date.today())
+
+
+def _set_today(monkeypatch, today):
+    class Today(date):
+        @classmethod
+        def today(cls):
+            return today
+
+    monkeypatch.setattr(export, "date", Today)
+
+
+def _read(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.reader(file))
+
+
+def test_pending_days_skip_written_partitions(tmp_path):
+    """Written days are skipped, today is fetched again until it has ended."""
+    output = str(tmp_path)
+    today = DAY + timedelta(days=2)
+    write_partition(partition_path(output, "IAMSTE256", DAY), "IAMSTE256", [])
+    write_partition(partition_path(output, "IAMSTE256", today), "IAMSTE256", [])
+    assert list(pending_days(output, ["IAMSTE256", "IAMSTE12"], DAY, today, today)) == [
+        ("IAMSTE256", DAY + timedelta(days=1)),
+        ("IAMSTE256", today),
+        ("IAMSTE12", DAY),
+        ("IAMSTE12", DAY + timedelta(days=1)),
+        ("IAMSTE12", today),
+    ]
+
+
+def test_write_partition_renames_complete_file(tmp_path):
+    """The partition only appears under its name once fully written."""
+    path = partition_path(str(tmp_path), "IAMSTE256", DAY)
+    observations = FakeClient()._observations("IAMSTE256", DAY)["observations"]
+    assert write_partition(path, "IAMSTE256", observations) == 3
+    assert sorted(p.name for p in (tmp_path / "IAMSTE256").iterdir()) == ["2024-05-14.csv"]
+    rows = _read(path)
+    assert rows[0] == list(COLUMNS)
+    assert [row[COLUMNS.index("temperature")] for row in rows[1:]] == ["10.0", "11.0", "12.0"]
+
+
+def test_interrupted_write_stays_pending(tmp_path):
+    """A write failing halfway leaves no partition that looks complete."""
+    output = str(tmp_path)
+
+    def interrupted():
+        yield from FakeClient()._observations("IAMSTE256", DAY)["observations"]
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        write_partition(partition_path(output, "IAMSTE256", DAY), "IAMSTE256", interrupted())
+    assert not (tmp_path / "IAMSTE256" / "2024-05-14.csv").exists()
+    assert list(pending_days(output, ["IAMSTE256"], DAY, DAY, DAY + timedelta(days=1))) == [
+        ("IAMSTE256", DAY)
+    ]
+
+
+async def test_today_replaced_once_complete(tmp_path, monkeypatch):
+    """Today is written as a partial partition, replaced the day after."""
+    output = str(tmp_path)
+    client = FakeClient()
+    _set_today(monkeypatch, DAY)
+    assert await async_export(client, ["IAMSTE256"], DAY, DAY, output) == 1
+    partial = partition_path(output, "IAMSTE256", DAY, partial=True)
+    assert len(_read(partial)) == 4
+    assert client.requests == [("recent", "IAMSTE256", DAY)]
+
+    _set_today(monkeypatch, DAY + timedelta(days=1))
+    client.requests.clear()
+    assert await async_export(client, ["IAMSTE256"], DAY, DAY, output) == 1
+    assert client.requests == [("history", "IAMSTE256", DAY)]
+    assert sorted(p.name for p in (tmp_path / "IAMSTE256").iterdir()) == ["2024-05-14.csv"]
+
+    # The complete day is not fetched again
+    client.requests.clear()
+    assert await async_export(client, ["IAMSTE256"], DAY, DAY, output) == 0
+    assert client.requests == []
@@ -0,0 +1,76 @@
+"""Tests of the failover to the nearest healthy station."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.WU_weather.failover import MAX_CANDIDATE_DISTANCE_KM, distance_km
+
+PRIMARY = "IPRIMARY"
+
+# About 1 km, 5.5 km and 33 km north of the primary station
+LOCATIONS = {
+    PRIMARY: (52.30, 4.86),
+    "INEAR": (52.31, 4.86),
+    "IMIDDLE": (52.35, 4.86),
+    "IFAR": (52.60, 4.86),
+}
+
+
+@pytest.fixture
+async def coordinator(hass, stub, make_coordinator):
+    """Return a failover coordinator that has looked up the stations near its station."""
+    stub.locations.update(LOCATIONS)
+    coordinator = make_coordinator([PRIMARY])
+    coordinator.failover = True
+    await coordinator.async_refresh()
+    # The lookup runs in the background after the first healthy observation
+    await asyncio.gather(*hass._background_tasks)
+    return coordinator
+
+
+async def test_candidates_within_distance(coordinator, stub):
+    """Candidates are ordered by distance, the far ones are left out."""
+    assert stub.requests["nearby"] == 1
+    candidates = coordinator._nearby[PRIMARY]["candidates"]
+    assert [candidate_id for candidate_id, _ in candidates] == ["INEAR", "IMIDDLE"]
+    assert distance_km(*LOCATIONS[PRIMARY], *LOCATIONS["IFAR"]) > MAX_CANDIDATE_DISTANCE_KM
+
+
+async def test_failover_and_recovery(coordinator, stub, make_due):
+    """The nearest healthy candidate serves until the station reports again."""
+    stub.failing.add(PRIMARY)
+    make_due(coordinator)
+    await coordinator.async_refresh()
+    assert coordinator.substitutes == {PRIMARY: "INEAR"}
+    assert coordinator.data[PRIMARY].latitude == LOCATIONS["INEAR"][0]
+    assert coordinator.stale_stations == set()
+
+    # The nearest candidate fails too, the next one takes over
+    stub.failing.add("INEAR")
+    make_due(coordinator)
+    await coordinator.async_refresh()
+    assert coordinator.substitutes == {PRIMARY: "IMIDDLE"}
+
+    # The nearest candidate is back, but the current substitute is kept
+    stub.failing.discard("INEAR")
+    make_due(coordinator)
+    await coordinator.async_refresh()
+    assert coordinator.substitutes == {PRIMARY: "IMIDDLE"}
+
+    stub.failing.discard(PRIMARY)
+    make_due(coordinator)
+    await coordinator.async_refresh()
+    assert coordinator.substitutes == {}
+    assert coordinator.data[PRIMARY].latitude == LOCATIONS[PRIMARY][0]
+
+
+async def test_no_healthy_candidate(coordinator, stub, make_due):
+    """Without a healthy candidate the last observation is served stale."""
+    stub.failing.update(LOCATIONS)
+    make_due(coordinator)
+    await coordinator.async_refresh()
+    assert coordinator.substitutes == {}
+    assert coordinator.stale_stations == {PRIMARY}
+    assert coordinator.data[PRIMARY].latitude == LOCATIONS[PRIMARY][0]
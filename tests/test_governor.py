@@ -0,0 +1,90 @@
+"""Tests of the request budget and the circuit breaker."""
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.WU_weather import governor
+from custom_components.WU_weather.governor import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_CURRENT,
+    PRIORITY_SCRAPE,
+    CircuitBreaker,
+    RequestGovernor,
+    TokenBucket,
+)
+
+
+def test_token_bucket_refills_continuously(monkeypatch):
+    """A drained bucket waits for the next token only."""
+    monkeypatch.setattr(governor.time, "monotonic", lambda: 0.0)
+    bucket = TokenBucket(2, 60)
+    bucket.take(0.0)
+    bucket.take(0.0)
+    assert bucket.delay(0.0) == 30.0
+    assert bucket.delay(15.0) == 15.0
+    assert bucket.delay(30.0) == 0.0
+
+
+async def test_waiters_served_by_priority():
+    """Current conditions go out before scrapes and background work."""
+    requests = RequestGovernor(per_minute=600)
+    for _ in range(600):
+        await requests.async_acquire()
+    served = []
+
+    async def acquire(priority):
+        await requests.async_acquire(priority)
+        served.append(priority)
+
+    await asyncio.gather(
+        acquire(PRIORITY_BACKGROUND), acquire(PRIORITY_SCRAPE), acquire(PRIORITY_CURRENT)
+    )
+    assert served == [PRIORITY_CURRENT, PRIORITY_SCRAPE, PRIORITY_BACKGROUND]
+
+
+def test_set_budget_keeps_spent_tokens(monkeypatch):
+    """A changed budget applies at once without refilling the buckets."""
+    monkeypatch.setattr(governor.time, "monotonic", lambda: 0.0)
+    requests = RequestGovernor(per_minute=30, per_day=1000)
+    for _ in range(30):
+        requests._take(0.0)
+
+    requests.set_budget(60, 500)
+    minute, day = requests._buckets
+    assert (minute.capacity, day.capacity) == (60, 500)
+    assert minute.tokens == 0
+    # The raised budget refills twice as fast
+    assert requests._wait_time(0.0) == 1.0
+
+    requests.set_budget(10, 20)
+    assert requests._buckets[1].tokens == 20
+
+
+def test_breaker_opens_and_probes(monkeypatch):
+    """The circuit opens after consecutive failures and lets single probes through."""
+    now = [1000.0]
+    monkeypatch.setattr(governor.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=3, probe_interval=30)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    now[0] += 30
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    # A failed probe doubles the wait before the next one
+    breaker.record_failure()
+    now[0] += 30
+    assert not breaker.allow()
+    now[0] += 30
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.as_dict() == {"state": "closed", "failures": 0, "probe_interval": 30}
@@ -0,0 +1,50 @@
+"""Tests of the streaming apiKey extractor."""
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.stub_server import PAGE_FIXTURE
+from benchmarks.synthesize import SYNTHETIC_API_KEY
+from custom_components.WU_weather.parser import ApiKeyExtractor, extract_api_key
+
+PAGE = PAGE_FIXTURE.read_bytes()
+API_KEY = SYNTHETIC_API_KEY
+
+
+def test_extracts_key_from_synthetic_page():
+    """The key of the first "u" entry of app-root-state is found."""
+    assert extract_api_key(PAGE) == API_KEY
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1000, 16384])
+def test_markers_split_across_chunks(chunk_size):
+    """The script and its end are found whatever the chunk boundaries."""
+    extractor = ApiKeyExtractor()
+    for start in range(0, len(PAGE), chunk_size):
+        if extractor.feed(PAGE[start:start + chunk_size]):
+            break
+    assert extractor.done
+    assert extractor.api_key == API_KEY
+
+
+def test_stops_at_end_of_script():
+    """Nothing after the state script needs to be read."""
+    end = PAGE.index(b"</script>", PAGE.index(b'id="app-root-state"')) + len(b"</script>")
+    extractor = ApiKeyExtractor()
+    assert extractor.feed(PAGE[:end]) == API_KEY
+    assert extractor.done
+
+
+def test_page_without_state():
+    """A page without app-root-state has no key."""
+    extractor = ApiKeyExtractor()
+    assert extractor.feed(b"<html><body>Access denied</body></html>") is None
+    assert not extractor.done
+
+
+def test_state_without_key():
+    """A state without an apiKey URL is complete but has no key."""
+    page = b'<script id="app-root-state" type="application/json">{"1":{"b":{}}}</script>'
+    extractor = ApiKeyExtractor()
+    assert extractor.feed(page) is None
+    assert extractor.done
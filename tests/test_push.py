@@ -0,0 +1,29 @@
+"""Tests of the local upload endpoint."""
+from __future__ import annotations
+
+from aiohttp.test_utils import make_mocked_request
+
+from custom_components.WU_weather.const import DOMAIN
+from custom_components.WU_weather.push import UPLOAD_PATH, WUUploadView
+
+UPLOAD = "ID=IAMSTE256&PASSWORD={}&dateutc=now&tempf=61.5&humidity=70"
+
+
+async def upload(hass, password):
+    request = make_mocked_request("GET", f"{UPLOAD_PATH}?{UPLOAD.format(password)}")
+    return await WUUploadView(hass).get(request)
+
+
+async def test_uploads_need_the_station_key(hass, make_coordinator):
+    """Only configurations that enabled uploads accept them, with their key."""
+    coordinator = make_coordinator(["IAMSTE256"])
+    hass.data.setdefault(DOMAIN, {})["coordinators"] = {"home": coordinator}
+
+    # Local uploads are disabled until a station key is set
+    assert (await upload(hass, "")).status == 401
+    coordinator.station_key = "s3cret"
+    assert (await upload(hass, "guess")).status == 401
+    assert coordinator.data is None
+
+    assert (await upload(hass, "s3cret")).status == 200
+    assert coordinator.data["IAMSTE256"].humidity == 70
@@ -0,0 +1,45 @@
+"""Tests of the diagnostic sensors."""
+from __future__ import annotations
+
+from custom_components.WU_weather.sensor import (
+    DIAGNOSTIC_SENSORS,
+    WUDiagnosticSensor,
+    _create_entities,
+)
+
+STATIONS = ["IAMSTE256", "IAMSTE12"]
+
+
+async def test_diagnostics_refresh_every_cycle(stub, make_coordinator, make_due):
+    """Cycles that change no observation or fail still refresh the diagnostics."""
+    coordinator = make_coordinator(STATIONS)
+    changed, cycles = [], []
+    coordinator.async_add_listener(lambda: changed.append(True))
+    coordinator.async_add_cycle_listener(lambda: cycles.append(True))
+    await coordinator.async_refresh()
+    assert (len(changed), len(cycles)) == (1, 1)
+
+    # Same observations again: the data is equal, only the cycle is reported
+    make_due(coordinator)
+    await coordinator.async_refresh()
+    assert (len(changed), len(cycles)) == (1, 2)
+
+    stub.failing.update(STATIONS)
+    make_due(coordinator)
+    await coordinator.async_refresh()
+    assert len(cycles) == 3
+    assert coordinator.consecutive_failures == 1
+
+    sensor = WUDiagnosticSensor(coordinator, "Home", DIAGNOSTIC_SENSORS[-1])
+    assert sensor.available
+    assert sensor.native_value == 1
+
+
+async def test_unique_ids(make_coordinator):
+    """Sensors can be customized from the UI, per station and configuration."""
+    coordinator = make_coordinator(STATIONS, "wu_weather.home")
+    sensors = _create_entities(coordinator, "Home", True)
+    unique_ids = [sensor.unique_id for sensor in sensors]
+    assert len(set(unique_ids)) == len(sensors)
+    assert "IAMSTE12_temperature" in unique_ids
+    assert "wu_weather.home_consecutive_failures" in unique_ids
@@ -0,0 +1,84 @@
+"""Tests of the weather platform set up from YAML."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.WU_weather import weather
+from custom_components.WU_weather.const import DOMAIN
+from custom_components.WU_weather.weather import (
+    PLATFORM_SCHEMA,
+    WUWeather,
+    yaml_storage_key,
+)
+
+
+@pytest.fixture
+def loaded(monkeypatch):
+    """Record the discovery info of the sensor platforms loaded by the setup."""
+    discovered = []
+
+    async def async_load_platform(hass, platform, domain, discovery_info, config):
+        discovered.append(discovery_info)
+
+    monkeypatch.setattr(weather, "async_load_platform", async_load_platform)
+    return discovered
+
+
+def _config(stub, stations):
+    return PLATFORM_SCHEMA({
+        "platform": DOMAIN,
+        "current_weather_url": stub.page_url(),
+        "stations": stations,
+    })
+
+
+async def test_same_name_different_stations(hass, stub, loaded):
+    """Configurations keeping the default name get their own coordinator."""
+    entities = []
+    first = _config(stub, ["IAMSTE256"])
+    second = _config(stub, ["IAMSTE12", "INOORD42"])
+    await weather.async_setup_platform(hass, first, entities.extend)
+    await weather.async_setup_platform(hass, second, entities.extend)
+    await hass.async_block_till_done()
+
+    coordinators = hass.data[DOMAIN]["coordinators"]
+    assert yaml_storage_key(first) != yaml_storage_key(second)
+    assert coordinators[yaml_storage_key(first)].stations == ["IAMSTE256"]
+    assert coordinators[yaml_storage_key(second)].stations == ["IAMSTE12", "INOORD42"]
+    # The sensors of each configuration bind to its own coordinator
+    assert [info["coordinator"] for info in loaded] == [
+        yaml_storage_key(first), yaml_storage_key(second)
+    ]
+    assert len(entities) == 3
+
+
+async def test_duplicate_configuration_ignored(hass, stub, loaded):
+    """A second configuration of the same name and stations is rejected."""
+    entities = []
+    config = _config(stub, ["IAMSTE256"])
+    await weather.async_setup_platform(hass, config, entities.extend)
+    first = hass.data[DOMAIN]["coordinators"][yaml_storage_key(config)]
+    await weather.async_setup_platform(hass, _config(stub, "iamste256"), entities.extend)
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN]["coordinators"] == {yaml_storage_key(config): first}
+    assert len(entities) == 1
+    assert len(loaded) == 1
+
+
+async def test_observation_time(stub, make_coordinator, make_due):
+    """The time of a stale observation stays correct between state writes."""
+    coordinator = make_coordinator(["IAMSTE256"])
+    entity = WUWeather(coordinator, "Home", "IAMSTE256")
+    await coordinator.async_refresh()
+    reported = dt_util.utc_from_timestamp(coordinator.data["IAMSTE256"].epoch)
+    assert entity.extra_state_attributes["observation_time"] == reported.isoformat()
+    assert entity.extra_state_attributes["stale"] is False
+
+    stub.failing.add("IAMSTE256")
+    make_due(coordinator)
+    await coordinator.async_refresh()
+    assert entity.extra_state_attributes["observation_time"] == reported.isoformat()
+    assert entity.extra_state_attributes["stale"] is True